@@ -0,0 +1,29 @@
+from django.db import migrations
+
+
+def create_stay_index(apps, schema_editor):
+    # GiST over the stay range backs OptimizedBookingQuerySet.overlapping();
+    # only PostgreSQL has range types
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS booking_stay_gist_idx ON bookings_booking "
+        "USING gist (daterange(check_in_date, check_out_date, '[)'))"
+    )
+
+
+def drop_stay_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS booking_stay_gist_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0003_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_stay_index, drop_stay_index),
+    ]
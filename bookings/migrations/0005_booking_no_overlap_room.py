@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-14 03:43
+
+import bookings.models
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0004_booking_stay_gist_index'),
+    ]
+
+    operations = [
+        # btree_gist provides the GiST = operator for room_id
+        BtreeGistExtension(),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=bookings.models.PostgresExclusionConstraint(condition=models.Q(('status__in', ['pending', 'confirmed', 'checked_in'])), expressions=[('room', '='), (bookings.models.DateRange('check_in_date', 'check_out_date', models.Value('[)')), '&&')], name='booking_no_overlap_room'),
+        ),
+    ]
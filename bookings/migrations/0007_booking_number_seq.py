@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+def create_booking_number_seq(apps, schema_editor):
+    # Backs Booking.generate_booking_number(); other backends fall back to a
+    # timestamp with a random suffix
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("CREATE SEQUENCE IF NOT EXISTS booking_number_seq")
+
+
+def drop_booking_number_seq(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("DROP SEQUENCE IF EXISTS booking_number_seq")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0006_booking_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_booking_number_seq, drop_booking_number_seq),
+    ]
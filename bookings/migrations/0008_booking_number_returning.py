@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-14 03:51
+
+import bookings.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0007_booking_number_seq'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='booking',
+            name='booking_number',
+            field=bookings.models.BookingNumberField(max_length=20, unique=True),
+        ),
+    ]
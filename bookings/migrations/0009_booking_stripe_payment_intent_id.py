@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-14 03:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0008_booking_number_returning'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='stripe_payment_intent_id',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+    ]
@@ -1,7 +1,49 @@
-from django.db import models
+import secrets
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateRangeField, RangeOperators
+from django.db import DEFAULT_DB_ALIAS, connections, models, router, transaction
+from django.db.models import Func, Q, Value
+from django.db.models.functions import Cast, Concat, LPad
 from django.core.validators import MinValueValidator
 from django.utils import timezone
+from core.exceptions import BookingError
 from core.models import BaseModel
+from core.optimizations import OptimizedBookingQuerySet
+
+
+class BookingNumberField(models.CharField):
+    """CharField read back with INSERT ... RETURNING, so database-side values reach the instance."""
+    db_returning = True
+
+
+class DateRange(Func):
+    """daterange(start, end, bounds) on PostgreSQL."""
+    function = 'daterange'
+    output_field = DateRangeField()
+
+
+class PostgresExclusionConstraint(ExclusionConstraint):
+    """ExclusionConstraint that is left out on databases other than PostgreSQL."""
+    
+    def constraint_sql(self, model, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return None
+        return super().constraint_sql(model, schema_editor)
+    
+    def create_sql(self, model, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return None
+        return super().create_sql(model, schema_editor)
+    
+    def remove_sql(self, model, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return None
+        return super().remove_sql(model, schema_editor)
+    
+    def validate(self, model, instance, exclude=None, using=DEFAULT_DB_ALIAS):
+        if connections[using].vendor != 'postgresql':
+            return
+        super().validate(model, instance, exclude=exclude, using=using)
 
 
 class Booking(BaseModel):
@@ -25,6 +67,16 @@ class Booking(BaseModel):
         (STATUS_NO_SHOW, 'No Show'),
     )
     
+    # Statuses reachable from each status
+    VALID_TRANSITIONS = {
+        STATUS_PENDING: frozenset({STATUS_CONFIRMED, STATUS_CANCELLED}),
+        STATUS_CONFIRMED: frozenset({STATUS_CHECKED_IN, STATUS_CANCELLED, STATUS_NO_SHOW}),
+        STATUS_CHECKED_IN: frozenset({STATUS_CHECKED_OUT}),
+        STATUS_CHECKED_OUT: frozenset(),
+        STATUS_CANCELLED: frozenset(),
+        STATUS_NO_SHOW: frozenset(),
+    }
+    
     # Payment status choices
     PAYMENT_PENDING = 'pending'
     PAYMENT_PAID = 'paid'
@@ -56,7 +108,7 @@ class Booking(BaseModel):
     )
     
     # Booking fields
-    booking_number = models.CharField(max_length=20, unique=True)
+    booking_number = BookingNumberField(max_length=20, unique=True)
     user = models.ForeignKey('users.User', on_delete=models.CASCADE, related_name='bookings')
     hotel = models.ForeignKey('hotels.Hotel', on_delete=models.CASCADE, related_name='bookings')
     room = models.ForeignKey('hotels.Room', on_delete=models.CASCADE, related_name='bookings')
@@ -70,6 +122,7 @@ class Booking(BaseModel):
     booking_source = models.CharField(max_length=20, choices=SOURCE_CHOICES, default=SOURCE_WEBSITE)
     total_price = models.DecimalField(max_digits=10, decimal_places=2)
     paid_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    stripe_payment_intent_id = models.CharField(max_length=100, blank=True, null=True)
     
     # Timestamps for status changes
     confirmed_at = models.DateTimeField(null=True, blank=True)
@@ -77,8 +130,26 @@ class Booking(BaseModel):
     checked_out_at = models.DateTimeField(null=True, blank=True)
     cancelled_at = models.DateTimeField(null=True, blank=True)
     
+    objects = OptimizedBookingQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['room', 'check_in_date', 'check_out_date', 'status'], name='booking_room_dates_idx'),
+            models.Index(fields=['user', '-created_at'], name='booking_user_created_idx'),
+            models.Index(fields=['hotel', 'status'], name='booking_hotel_status_idx'),
+        ]
+        constraints = [
+            # Two active bookings of the same room may not share a night
+            PostgresExclusionConstraint(
+                name='booking_no_overlap_room',
+                expressions=[
+                    ('room', RangeOperators.EQUAL),
+                    (DateRange('check_in_date', 'check_out_date', Value('[)')), RangeOperators.OVERLAPS),
+                ],
+                condition=Q(status__in=['pending', 'confirmed', 'checked_in']),
+            ),
+        ]
     
     def __str__(self):
         return f"Booking #{self.booking_number} - {self.user.email}"
@@ -91,56 +162,87 @@ class Booking(BaseModel):
     
     def generate_booking_number(self):
         """Generate a unique booking number."""
-        now = timezone.now()
-        return f"BK{now.strftime('%Y%m%d')}{now.strftime('%H%M%S')}"
+        connection = connections[router.db_for_write(Booking, instance=self)]
+        if connection.vendor == 'postgresql':
+            # Evaluated by the INSERT itself from booking_number_seq (created by
+            # migration 0007); the result comes back through RETURNING
+            return Concat(
+                Value('BK'),
+                LPad(
+                    Cast(Func(Value('booking_number_seq'), function='nextval'), models.CharField()),
+                    10,
+                    Value('0'),
+                ),
+                output_field=models.CharField(),
+            )
+        # Without sequences, a random suffix keeps bookings made in the same
+        # second apart
+        return f"BK{timezone.now():%Y%m%d%H%M%S}{secrets.token_hex(2).upper()}"
+    
+    def can_transition_to(self, status):
+        """Return whether the booking may move from its current status to status."""
+        return status in self.VALID_TRANSITIONS.get(self.status, ())
+    
+    def _check_transition(self, status):
+        if not self.can_transition_to(status):
+            raise BookingError(f"Cannot transition from {self.status} to {status}")
     
     def confirm(self):
         """Confirm the booking."""
+        self._check_transition(self.STATUS_CONFIRMED)
         self.status = self.STATUS_CONFIRMED
         self.confirmed_at = timezone.now()
-        self.save()
+        self.save(update_fields=['status', 'confirmed_at', 'updated_at'])
     
     def check_in(self):
         """Check in the guest."""
+        self._check_transition(self.STATUS_CHECKED_IN)
         self.status = self.STATUS_CHECKED_IN
         self.checked_in_at = timezone.now()
-        self.save()
+        self.save(update_fields=['status', 'checked_in_at', 'updated_at'])
     
     def check_out(self):
         """Check out the guest."""
+        self._check_transition(self.STATUS_CHECKED_OUT)
         self.status = self.STATUS_CHECKED_OUT
         self.checked_out_at = timezone.now()
-        self.save()
+        self.save(update_fields=['status', 'checked_out_at', 'updated_at'])
     
     def cancel(self):
         """Cancel the booking."""
+        self._check_transition(self.STATUS_CANCELLED)
         self.status = self.STATUS_CANCELLED
         self.cancelled_at = timezone.now()
-        self.save()
+        self.save(update_fields=['status', 'cancelled_at', 'updated_at'])
     
     def mark_as_no_show(self):
         """Mark the booking as no show."""
+        self._check_transition(self.STATUS_NO_SHOW)
         self.status = self.STATUS_NO_SHOW
-        self.save()
+        self.save(update_fields=['status', 'updated_at'])
     
-    def record_payment(self, amount):
+    def record_payment(self, amount, transaction_id=None):
         """Record a payment for the booking."""
-        self.paid_amount += amount
-        
-        if self.paid_amount >= self.total_price:
-            self.payment_status = self.PAYMENT_PAID
-        elif self.paid_amount > 0:
-            self.payment_status = self.PAYMENT_PARTIALLY_PAID
+        if amount <= 0:
+            return
         
-        self.save()
-        
-        # Create payment record
-        Payment.objects.create(
-            booking=self,
-            amount=amount,
-            payment_method='credit_card',  # Default method
-            status='completed'
-        )
+        # The Payment post_save signal applies the amount to paid_amount
+        # and payment_status with a single atomic UPDATE; the row lock
+        # serialises concurrent payments against the same booking
+        with transaction.atomic():
+            Booking.objects.select_for_update().only('pk').get(pk=self.pk)
+            if transaction_id and Payment.objects.filter(
+                transaction_id=transaction_id, status=Payment.STATUS_COMPLETED
+            ).exists():
+                return
+            Payment.objects.create(
+                booking=self,
+                amount=amount,
+                payment_method='credit_card',  # Default method
+                transaction_id=transaction_id,
+                status='completed'
+            )
+        self.refresh_from_db(fields=['paid_amount', 'payment_status'])
     
     @property
     def duration_days(self):
@@ -210,4 +312,5 @@ class Payment(BaseModel):
     notes = models.TextField(blank=True, null=True)
     
     def __str__(self):
-        return f"Payment of {self.amount} for {self.booking.booking_number}"
\ No newline at end of file
+        # booking_id avoids loading the booking for every admin list row
+        return f"Payment #{self.pk} of {self.amount} for booking {self.booking_id}"
\ No newline at end of file
@@ -1,5 +1,7 @@
 import stripe
+from decimal import Decimal
 from django.conf import settings
+from django.db import transaction
 from django.http import JsonResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -9,26 +11,52 @@ from .models import Booking, Payment
 
 stripe.api_key = settings.STRIPE_SECRET_KEY
 
+# Payment intent states that can still be confirmed by the customer
+REUSABLE_INTENT_STATUSES = frozenset({
+    'requires_payment_method', 'requires_confirmation', 'requires_action'
+})
+
+
+def _amount_from_cents(cents):
+    """Convert a Stripe amount in cents to an exact Decimal."""
+    return Decimal(cents) / 100
+
 
 class CreatePaymentIntentView(APIView):
     """Create a Stripe payment intent for a booking."""
     
     def post(self, request, booking_id):
         try:
-            booking = Booking.objects.get(id=booking_id, user=request.user)
+            booking = Booking.objects.only(
+                'id', 'booking_number', 'total_price', 'paid_amount', 'stripe_payment_intent_id'
+            ).get(id=booking_id, user=request.user)
+            
+            if booking.balance_due <= 0:
+                return Response({'status': 'already_paid'})
             
             # Calculate amount in cents
             amount_cents = int(booking.balance_due * 100)
             
-            # Create payment intent
-            intent = stripe.PaymentIntent.create(
-                amount=amount_cents,
-                currency='usd',
-                metadata={
-                    'booking_id': booking.id,
-                    'booking_number': booking.booking_number,
-                }
-            )
+            # Reuse the booking's open payment intent instead of creating a
+            # new one every time the checkout page is loaded
+            intent = None
+            if booking.stripe_payment_intent_id:
+                intent = stripe.PaymentIntent.retrieve(booking.stripe_payment_intent_id)
+                if intent.status not in REUSABLE_INTENT_STATUSES:
+                    intent = None
+                elif intent.amount != amount_cents:
+                    intent = stripe.PaymentIntent.modify(intent.id, amount=amount_cents)
+            
+            if intent is None:
+                intent = stripe.PaymentIntent.create(
+                    amount=amount_cents,
+                    currency='usd',
+                    metadata={
+                        'booking_id': booking.id,
+                        'booking_number': booking.booking_number,
+                    }
+                )
+                Booking.objects.filter(pk=booking.pk).update(stripe_payment_intent_id=intent.id)
             
             return Response({
                 'client_secret': intent.client_secret,
@@ -81,22 +109,26 @@ class StripeWebhookView(APIView):
     def _handle_payment_success(self, payment_intent):
         """Handle successful payment."""
         booking_id = payment_intent['metadata']['booking_id']
-        amount = payment_intent['amount'] / 100  # Convert from cents
+        amount = _amount_from_cents(payment_intent['amount'])
         
         try:
-            booking = Booking.objects.get(id=booking_id)
-            
-            # Create payment record
-            payment = Payment.objects.create(
-                booking=booking,
-                amount=amount,
-                payment_method=Payment.METHOD_CREDIT_CARD,
-                transaction_id=payment_intent['id'],
-                status=Payment.STATUS_COMPLETED
-            )
+            with transaction.atomic():
+                # Lock the booking so concurrent deliveries of the same event
+                # cannot both pass the get_or_create lookup
+                booking = Booking.objects.select_for_update().get(id=booking_id)
+                
+                # Stripe retries webhooks; record each payment intent only once
+                Payment.objects.get_or_create(
+                    transaction_id=payment_intent['id'],
+                    status=Payment.STATUS_COMPLETED,
+                    defaults={
+                        'booking': booking,
+                        'amount': amount,
+                        'payment_method': Payment.METHOD_CREDIT_CARD,
+                    }
+                )
             
-            # Update booking payment status
-            booking.record_payment(amount)
+            # Booking paid_amount/payment_status are updated by the Payment post_save signal
             
         except Booking.DoesNotExist:
             pass  # Log error in production
@@ -106,16 +138,19 @@ class StripeWebhookView(APIView):
         booking_id = payment_intent['metadata']['booking_id']
         
         try:
-            booking = Booking.objects.get(id=booking_id)
-            
-            # Create failed payment record
-            Payment.objects.create(
-                booking=booking,
-                amount=payment_intent['amount'] / 100,
-                payment_method=Payment.METHOD_CREDIT_CARD,
-                transaction_id=payment_intent['id'],
-                status=Payment.STATUS_FAILED
-            )
+            with transaction.atomic():
+                booking = Booking.objects.select_for_update().get(id=booking_id)
+                
+                # Record a failed payment intent once, however often Stripe redelivers it
+                Payment.objects.get_or_create(
+                    transaction_id=payment_intent['id'],
+                    status=Payment.STATUS_FAILED,
+                    defaults={
+                        'booking': booking,
+                        'amount': _amount_from_cents(payment_intent['amount']),
+                        'payment_method': Payment.METHOD_CREDIT_CARD,
+                    }
+                )
             
         except Booking.DoesNotExist:
             pass  # Log error in production
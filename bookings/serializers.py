@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from django.db import IntegrityError, connections, transaction
 from django.utils import timezone
 from .models import Booking, Payment
 from hotels.serializers import HotelListSerializer, RoomSerializer
@@ -18,8 +19,6 @@ class PaymentSerializer(serializers.ModelSerializer):
 class BookingSerializer(serializers.ModelSerializer):
     """Serializer for the Booking model."""
     
-    hotel_details = HotelListSerializer(source='hotel', read_only=True)
-    room_details = RoomSerializer(source='room', read_only=True)
     duration_days = serializers.IntegerField(read_only=True)
     balance_due = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
     is_upcoming = serializers.BooleanField(read_only=True)
@@ -27,7 +26,7 @@ class BookingSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Booking
-        fields = ['id', 'booking_number', 'user', 'hotel', 'hotel_details', 'room', 'room_details',
+        fields = ['id', 'booking_number', 'user', 'hotel', 'room',
                   'check_in_date', 'check_out_date', 'adults', 'children', 'special_requests',
                   'status', 'payment_status', 'booking_source', 'total_price', 'paid_amount',
                   'confirmed_at', 'checked_in_at', 'checked_out_at', 'cancelled_at',
@@ -49,18 +48,16 @@ class BookingSerializer(serializers.ModelSerializer):
                 "check_in_date": "Check-in date cannot be in the past."
             })
         
-        # Check room availability
-        if self.instance is None:  # Only for new bookings
+        # Check room availability. PostgreSQL enforces this atomically through
+        # the booking_no_overlap_room exclusion constraint (see create()).
+        if self.instance is None and connections[Booking.objects.db].vendor != 'postgresql':
             room = data.get('room')
             check_in_date = data.get('check_in_date')
             check_out_date = data.get('check_out_date')
             
             if room and check_in_date and check_out_date:
-                # Check if room is available for the given dates
-                overlapping_bookings = Booking.objects.filter(
+                overlapping_bookings = Booking.objects.overlapping(check_in_date, check_out_date).filter(
                     room=room,
-                    check_in_date__lt=check_out_date,
-                    check_out_date__gt=check_in_date,
                     status__in=[Booking.STATUS_PENDING, Booking.STATUS_CONFIRMED, Booking.STATUS_CHECKED_IN]
                 )
                 
@@ -91,7 +88,36 @@ class BookingSerializer(serializers.ModelSerializer):
         # Set the total price
         validated_data['total_price'] = total_price
         
-        return super().create(validated_data)
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError as e:
+            diag = getattr(e.__cause__, 'diag', None)
+            if getattr(diag, 'constraint_name', None) != 'booking_no_overlap_room':
+                raise
+            raise serializers.ValidationError({
+                "room": "This room is not available for the selected dates."
+            })
+
+
+class BookingListSerializer(BookingSerializer):
+    """Serializer for listing bookings without nested hotel and room details."""
+    
+    hotel_name = serializers.CharField(source='hotel.name', read_only=True)
+    room_number = serializers.CharField(source='room.room_number', read_only=True)
+    
+    class Meta(BookingSerializer.Meta):
+        fields = BookingSerializer.Meta.fields + ['hotel_name', 'room_number']
+
+
+class BookingDetailSerializer(BookingSerializer):
+    """Serializer for a single booking with nested hotel and room details."""
+    
+    hotel_details = HotelListSerializer(source='hotel', read_only=True)
+    room_details = RoomSerializer(source='room', read_only=True)
+    
+    class Meta(BookingSerializer.Meta):
+        fields = BookingSerializer.Meta.fields + ['hotel_details', 'room_details']
 
 
 class BookingCreateSerializer(BookingSerializer):
@@ -109,20 +135,12 @@ class BookingStatusUpdateSerializer(serializers.ModelSerializer):
         fields = ['status']
     
     def validate_status(self, value):
-        valid_transitions = {
-            Booking.STATUS_PENDING: [Booking.STATUS_CONFIRMED, Booking.STATUS_CANCELLED],
-            Booking.STATUS_CONFIRMED: [Booking.STATUS_CHECKED_IN, Booking.STATUS_CANCELLED, Booking.STATUS_NO_SHOW],
-            Booking.STATUS_CHECKED_IN: [Booking.STATUS_CHECKED_OUT],
-            Booking.STATUS_CHECKED_OUT: [],
-            Booking.STATUS_CANCELLED: [],
-            Booking.STATUS_NO_SHOW: [],
-        }
-        
         current_status = self.instance.status
-        if value not in valid_transitions[current_status]:
+        allowed = Booking.VALID_TRANSITIONS[current_status]
+        if not self.instance.can_transition_to(value):
             raise serializers.ValidationError(
                 f"Cannot transition from {current_status} to {value}. "
-                f"Valid transitions are: {', '.join(valid_transitions[current_status])}"
+                f"Valid transitions are: {', '.join(sorted(allowed))}"
             )
         
         return value
@@ -1,7 +1,24 @@
+from django.db import transaction
+from django.db.models import Case, F, Value, When
 from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
+from hotels.models import Room
 from .models import Booking, Payment
 
+# Statuses in which a booking no longer holds its room
+_INACTIVE = frozenset({Booking.STATUS_CANCELLED, Booking.STATUS_NO_SHOW})
+_CHECKOUT_SET = _INACTIVE | {Booking.STATUS_CHECKED_OUT}
+
+
+def _set_room_availability(room_id, is_available):
+    """
+    Update a room's availability once the booking's transaction commits,
+    so the Room row is not locked for the rest of the booking write.
+    """
+    transaction.on_commit(
+        lambda: Room.objects.filter(pk=room_id).update(is_available=is_available)
+    )
+
 
 @receiver(pre_save, sender=Booking)
 def update_room_availability(sender, instance, **kwargs):
@@ -10,29 +27,24 @@ def update_room_availability(sender, instance, **kwargs):
     """
     if instance.pk:  # Existing booking
         try:
-            old_instance = Booking.objects.get(pk=instance.pk)
+            old_instance = Booking.objects.only('status', 'room_id').get(pk=instance.pk)
             
             # If status changed to cancelled or no_show, make the room available
-            if instance.status in [Booking.STATUS_CANCELLED, Booking.STATUS_NO_SHOW] and \
-               old_instance.status not in [Booking.STATUS_CANCELLED, Booking.STATUS_NO_SHOW]:
-                instance.room.is_available = True
-                instance.room.save()
+            if instance.status in _INACTIVE and old_instance.status not in _INACTIVE:
+                _set_room_availability(instance.room_id, True)
             
             # If room changed, update availability of both rooms
-            if old_instance.room != instance.room:
-                old_instance.room.is_available = True
-                old_instance.room.save()
+            if old_instance.room_id != instance.room_id:
+                _set_room_availability(old_instance.room_id, True)
                 
-                if instance.status not in [Booking.STATUS_CANCELLED, Booking.STATUS_NO_SHOW, Booking.STATUS_CHECKED_OUT]:
-                    instance.room.is_available = False
-                    instance.room.save()
+                if instance.status not in _CHECKOUT_SET:
+                    _set_room_availability(instance.room_id, False)
                 
         except Booking.DoesNotExist:
             pass
     else:  # New booking
-        if instance.status not in [Booking.STATUS_CANCELLED, Booking.STATUS_NO_SHOW]:
-            instance.room.is_available = False
-            instance.room.save()
+        if instance.status not in _INACTIVE:
+            _set_room_availability(instance.room_id, False)
 
 
 @receiver(post_save, sender=Payment)
@@ -41,18 +53,15 @@ def update_booking_payment_status(sender, instance, created, **kwargs):
     Update booking payment status when a payment is created or updated.
     """
     if created and instance.status == Payment.STATUS_COMPLETED:
-        booking = instance.booking
-        total_paid = booking.payments.filter(status=Payment.STATUS_COMPLETED).aggregate(
-            total=models.Sum('amount')
-        )['total'] or 0
-        
-        booking.paid_amount = total_paid
-        
-        if total_paid >= booking.total_price:
-            booking.payment_status = Booking.PAYMENT_PAID
-        elif total_paid > 0:
-            booking.payment_status = Booking.PAYMENT_PARTIALLY_PAID
-        else:
-            booking.payment_status = Booking.PAYMENT_PENDING
-        
-        booking.save()
\ No newline at end of file
+        # Apply the payment atomically: paid_amount is compared before the
+        # increment, so "old paid >= total - amount" means the booking is now paid
+        Booking.objects.filter(pk=instance.booking_id).update(
+            paid_amount=F('paid_amount') + instance.amount,
+            payment_status=Case(
+                When(
+                    paid_amount__gte=F('total_price') - instance.amount,
+                    then=Value(Booking.PAYMENT_PAID)
+                ),
+                default=Value(Booking.PAYMENT_PARTIALLY_PAID)
+            )
+        )
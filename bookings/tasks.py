@@ -1,16 +1,20 @@
-from django.core.mail import send_mail
+from django.core.mail import EmailMultiAlternatives, get_connection, send_mail
 from django.template.loader import render_to_string
 from django.conf import settings
 from celery import shared_task
 
 
+# Relations the email templates render; loaded up front so rendering is query-free.
+BOOKING_EMAIL_RELATED = ('user', 'hotel', 'hotel__location', 'room', 'room__room_type')
+
+
 @shared_task
 def send_booking_confirmation_email(booking_id):
     """Send booking confirmation email to customer."""
     from .models import Booking
     
     try:
-        booking = Booking.objects.get(id=booking_id)
+        booking = Booking.objects.select_related(*BOOKING_EMAIL_RELATED).get(id=booking_id)
         
         subject = f'Booking Confirmation - {booking.booking_number}'
         html_message = render_to_string('bookings/emails/booking_confirmation.html', {
@@ -39,7 +43,7 @@ def send_booking_reminder_email(booking_id):
     from .models import Booking
     
     try:
-        booking = Booking.objects.get(id=booking_id)
+        booking = Booking.objects.select_related(*BOOKING_EMAIL_RELATED).get(id=booking_id)
         
         subject = f'Check-in Reminder - {booking.booking_number}'
         html_message = render_to_string('bookings/emails/booking_reminder.html', {
@@ -62,13 +66,44 @@ def send_booking_reminder_email(booking_id):
         return f"Booking with id {booking_id} does not exist"
 
 
+@shared_task
+def send_reminder_batch(booking_ids):
+    """Send check-in reminders for many bookings over one SMTP connection."""
+    from .models import Booking
+    
+    bookings = Booking.objects.select_related(*BOOKING_EMAIL_RELATED).filter(id__in=booking_ids)
+    
+    with get_connection() as connection:
+        messages = []
+        for booking in bookings:
+            html_message = render_to_string('bookings/emails/booking_reminder.html', {
+                'booking': booking,
+                'user': booking.user,
+            })
+            message = EmailMultiAlternatives(
+                subject=f'Check-in Reminder - {booking.booking_number}',
+                body='',
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[booking.user.email],
+                connection=connection,
+            )
+            message.attach_alternative(html_message, 'text/html')
+            messages.append(message)
+        
+        sent = connection.send_messages(messages) or 0
+    
+    return f"Reminder emails sent for {sent} bookings"
+
+
 @shared_task
 def send_payment_receipt_email(payment_id):
     """Send payment receipt email to customer."""
     from .models import Payment
     
     try:
-        payment = Payment.objects.get(id=payment_id)
+        payment = Payment.objects.select_related(
+            *(f'booking__{field}' for field in BOOKING_EMAIL_RELATED)
+        ).get(id=payment_id)
         booking = payment.booking
         
         subject = f'Payment Receipt - {booking.booking_number}'
@@ -0,0 +1,343 @@
+import datetime
+import re
+from decimal import Decimal
+from unittest import skipUnless
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from core.exceptions import BookingError
+from core.services import HotelService
+from hotels.models import Hotel, Location, Room, RoomType
+from users.models import User
+from .models import Booking, Payment
+from .serializers import BookingSerializer, BookingStatusUpdateSerializer
+
+
+def create_booking(**kwargs):
+    """Create a booking in a new hotel for a new user."""
+    location = Location.objects.create(
+        address='1 Test Street',
+        city='Lagos',
+        state='Lagos',
+        country='Nigeria',
+        zip_code='100001'
+    )
+    hotel = Hotel.objects.create(
+        name='Test Hotel',
+        description='A test hotel',
+        location=location,
+        star_rating=4,
+        contact_email='hotel@example.com',
+        contact_phone='+2340000000'
+    )
+    room_type = RoomType.objects.create(
+        hotel=hotel,
+        name='Standard',
+        description='A standard room',
+        max_occupancy=2,
+        base_price=Decimal('100.00'),
+        size_sqm=20
+    )
+    room = Room.objects.create(hotel=hotel, room_type=room_type, room_number='101', floor=1)
+    user = User.objects.create_user(
+        email='guest@example.com',
+        password='testpassword',
+        first_name='Test',
+        last_name='Guest'
+    )
+    today = timezone.localdate()
+    fields = {
+        'user': user,
+        'hotel': hotel,
+        'room': room,
+        'check_in_date': today + datetime.timedelta(days=1),
+        'check_out_date': today + datetime.timedelta(days=3),
+        'total_price': Decimal('200.00'),
+    }
+    fields.update(kwargs)
+    return Booking.objects.create(**fields)
+
+
+@override_settings(STRIPE_SECRET_KEY='sk_test', STRIPE_WEBHOOK_SECRET='whsec_test')
+class StripeWebhookTests(TestCase):
+    """Tests for the Stripe webhook payment handlers."""
+    
+    def setUp(self):
+        # payment_views reads the Stripe keys when it is imported
+        from .payment_views import StripeWebhookView
+        
+        self.booking = create_booking()
+        self.view = StripeWebhookView()
+    
+    def payment_intent(self, intent_id='pi_test', amount=20000):
+        return {'id': intent_id, 'amount': amount, 'metadata': {'booking_id': str(self.booking.id)}}
+    
+    def test_payment_success_is_recorded_once(self):
+        """Test that a redelivered succeeded event records and applies the payment once."""
+        self.view._handle_payment_success(self.payment_intent())
+        self.view._handle_payment_success(self.payment_intent())
+        
+        payments = Payment.objects.filter(transaction_id='pi_test')
+        self.assertEqual(payments.count(), 1)
+        self.assertEqual(payments.get().status, Payment.STATUS_COMPLETED)
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.paid_amount, Decimal('200.00'))
+        self.assertEqual(self.booking.payment_status, Booking.PAYMENT_PAID)
+    
+    def test_partial_payment_amount_is_exact(self):
+        """Test that cent amounts are converted without float rounding."""
+        self.view._handle_payment_success(self.payment_intent(amount=1999))
+        
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.paid_amount, Decimal('19.99'))
+        self.assertEqual(self.booking.payment_status, Booking.PAYMENT_PARTIALLY_PAID)
+    
+    def test_payment_failure_is_recorded_once(self):
+        """Test that a redelivered failed event records a single failed payment."""
+        self.view._handle_payment_failure(self.payment_intent())
+        self.view._handle_payment_failure(self.payment_intent())
+        
+        payments = Payment.objects.filter(transaction_id='pi_test')
+        self.assertEqual(payments.count(), 1)
+        self.assertEqual(payments.get().status, Payment.STATUS_FAILED)
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.paid_amount, 0)
+    
+    def test_success_after_failure(self):
+        """Test that a retried intent that succeeds after failing is still recorded as paid."""
+        self.view._handle_payment_failure(self.payment_intent())
+        self.view._handle_payment_success(self.payment_intent())
+        
+        self.assertEqual(
+            set(Payment.objects.filter(transaction_id='pi_test').values_list('status', flat=True)),
+            {Payment.STATUS_FAILED, Payment.STATUS_COMPLETED}
+        )
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.payment_status, Booking.PAYMENT_PAID)
+    
+    def test_unknown_booking_is_ignored(self):
+        """Test that an event for a missing booking records nothing."""
+        intent = self.payment_intent()
+        intent['metadata']['booking_id'] = str(self.booking.id + 1)
+        
+        self.view._handle_payment_success(intent)
+        self.view._handle_payment_failure(intent)
+        
+        self.assertFalse(Payment.objects.exists())
+
+
+class HotelAnalyticsTests(TestCase):
+    """Tests for HotelService.get_hotel_analytics."""
+    
+    def setUp(self):
+        cache.clear()
+        self.booking = create_booking(status=Booking.STATUS_CONFIRMED)
+        self.hotel = self.booking.hotel
+    
+    def test_booking_stats(self):
+        """Test the booking count, paid revenue and occupancy figures."""
+        self.booking.check_in_date = timezone.localdate()
+        self.booking.status = Booking.STATUS_CHECKED_IN
+        self.booking.save()
+        self.booking.record_payment(self.booking.total_price, transaction_id='txn_1')
+        
+        analytics = HotelService.get_hotel_analytics(self.hotel.id)
+        
+        self.assertEqual(analytics['total_bookings'], 1)
+        self.assertEqual(analytics['revenue_this_month'], Decimal('200.00'))
+        self.assertEqual(analytics['occupied_rooms'], 1)
+        self.assertEqual(analytics['occupancy_rate'], 100)
+    
+    def test_stats_are_cached_until_bookings_change(self):
+        """Test that the aggregate is cached and recomputed after a booking or payment write."""
+        HotelService.get_hotel_analytics(self.hotel.id)
+        with self.assertNumQueries(1):  # hotel with its room count only
+            HotelService.get_hotel_analytics(self.hotel.id)
+        
+        self.booking.record_payment(self.booking.total_price, transaction_id='txn_1')
+        analytics = HotelService.get_hotel_analytics(self.hotel.id)
+        
+        self.assertEqual(analytics['revenue_this_month'], Decimal('200.00'))
+
+
+class BookingComputedFieldsTests(TestCase):
+    """Tests for the computed Booking properties."""
+    
+    def setUp(self):
+        self.booking = create_booking(status=Booking.STATUS_CONFIRMED)
+    
+    def test_properties_follow_writes(self):
+        """Test that the properties reflect changes made to the same instance."""
+        self.assertEqual(self.booking.duration_days, 2)
+        self.assertEqual(self.booking.balance_due, Decimal('200.00'))
+        self.assertTrue(self.booking.is_upcoming)
+        self.assertFalse(self.booking.is_active)
+        
+        self.booking.record_payment(Decimal('50.00'), transaction_id='txn_1')
+        self.booking.check_in_date = timezone.localdate()
+        self.booking.check_in()
+        
+        self.assertEqual(self.booking.duration_days, 3)
+        self.assertEqual(self.booking.balance_due, Decimal('150.00'))
+        self.assertFalse(self.booking.is_upcoming)
+        self.assertTrue(self.booking.is_active)
+    
+    def test_list_renders_properties(self):
+        """Test that the booking list renders the computed values."""
+        self.client.force_login(self.booking.user)
+        response = self.client.get('/api/bookings/', HTTP_ACCEPT='application/json')
+        
+        booking = response.data['results'][0]
+        self.assertEqual(booking['duration_days'], 2)
+        self.assertEqual(booking['balance_due'], '200.00')
+        self.assertTrue(booking['is_upcoming'])
+        self.assertFalse(booking['is_active'])
+
+
+class BookingNumberTests(TestCase):
+    """Tests for booking number generation."""
+    
+    def setUp(self):
+        self.booking = create_booking()
+    
+    def create_bookings(self, count):
+        return [
+            Booking.objects.create(
+                user=self.booking.user,
+                hotel=self.booking.hotel,
+                room=self.booking.room,
+                check_in_date=self.booking.check_out_date + datetime.timedelta(days=i * 2),
+                check_out_date=self.booking.check_out_date + datetime.timedelta(days=i * 2 + 1),
+                total_price=self.booking.total_price
+            )
+            for i in range(count)
+        ]
+    
+    def test_numbers_are_unique(self):
+        """Test that bookings created together get distinct numbers that match the stored value."""
+        bookings = [self.booking] + self.create_bookings(5)
+        
+        numbers = [booking.booking_number for booking in bookings]
+        self.assertEqual(len(set(numbers)), len(numbers))
+        for booking in bookings:
+            self.assertRegex(booking.booking_number, r'^BK[0-9A-F]{10,18}$')
+            self.assertEqual(Booking.objects.get(pk=booking.pk).booking_number, booking.booking_number)
+    
+    def test_existing_number_is_kept(self):
+        """Test that saving a booking does not replace its number."""
+        number = self.booking.booking_number
+        
+        self.booking.special_requests = 'Late check-in'
+        self.booking.save()
+        
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.booking_number, number)
+    
+    @skipUnless(connection.vendor == 'postgresql', 'booking_number_seq needs PostgreSQL')
+    def test_numbers_come_from_sequence(self):
+        """Test that PostgreSQL numbers are consecutive zero-padded sequence values."""
+        bookings = self.create_bookings(2)
+        
+        first, second = (int(re.fullmatch(r'BK(\d{10})', b.booking_number).group(1)) for b in bookings)
+        self.assertEqual(second, first + 1)
+
+
+class BookingStatusTests(TestCase):
+    """Tests for booking status transitions."""
+    
+    def setUp(self):
+        self.booking = create_booking()
+    
+    def test_valid_transitions(self):
+        """Test that a booking moves through its lifecycle."""
+        self.booking.confirm()
+        self.booking.check_in()
+        self.booking.check_out()
+        
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, Booking.STATUS_CHECKED_OUT)
+        self.assertIsNotNone(self.booking.confirmed_at)
+        self.assertIsNotNone(self.booking.checked_out_at)
+    
+    def test_invalid_transition_is_rejected(self):
+        """Test that the model methods refuse transitions outside the map and save nothing."""
+        with self.assertRaises(BookingError):
+            self.booking.check_in()
+        
+        self.booking.cancel()
+        with self.assertRaises(BookingError):
+            self.booking.confirm()
+        
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, Booking.STATUS_CANCELLED)
+        self.assertIsNone(self.booking.confirmed_at)
+    
+    def test_status_serializer_uses_model_transitions(self):
+        """Test that the status update serializer validates against Booking.VALID_TRANSITIONS."""
+        serializer = BookingStatusUpdateSerializer(self.booking, data={'status': Booking.STATUS_CHECKED_OUT})
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('status', serializer.errors)
+        
+        serializer = BookingStatusUpdateSerializer(self.booking, data={'status': Booking.STATUS_CONFIRMED})
+        self.assertTrue(serializer.is_valid())
+        serializer.save()
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, Booking.STATUS_CONFIRMED)
+
+
+class BookingOverlapTests(TestCase):
+    """Tests for rejecting overlapping bookings of a room."""
+    
+    def setUp(self):
+        self.booking = create_booking()
+    
+    def booking_data(self, **kwargs):
+        data = {
+            'user': self.booking.user_id,
+            'hotel': self.booking.hotel_id,
+            'room': self.booking.room_id,
+            'check_in_date': self.booking.check_in_date + datetime.timedelta(days=1),
+            'check_out_date': self.booking.check_out_date + datetime.timedelta(days=1),
+            'total_price': '200.00',
+        }
+        data.update(kwargs)
+        return data
+    
+    def test_overlapping_booking_is_rejected(self):
+        """Test that the serializer reports an overlapping stay as a room error."""
+        serializer = BookingSerializer(data=self.booking_data())
+        
+        with self.assertRaises(ValidationError) as context:
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+        
+        self.assertIn('room', context.exception.detail)
+        self.assertEqual(Booking.objects.count(), 1)
+    
+    def test_adjacent_booking_is_accepted(self):
+        """Test that a stay starting on the previous check-out date does not overlap."""
+        serializer = BookingSerializer(data=self.booking_data(
+            check_in_date=self.booking.check_out_date,
+            check_out_date=self.booking.check_out_date + datetime.timedelta(days=2),
+        ))
+        
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+        self.assertEqual(Booking.objects.count(), 2)
+    
+    @skipUnless(connection.vendor == 'postgresql', 'exclusion constraints need PostgreSQL')
+    def test_exclusion_constraint(self):
+        """Test that the database rejects an overlapping active booking by constraint name."""
+        with self.assertRaises(IntegrityError) as context, transaction.atomic():
+            Booking.objects.create(
+                user=self.booking.user,
+                hotel=self.booking.hotel,
+                room=self.booking.room,
+                check_in_date=self.booking.check_in_date,
+                check_out_date=self.booking.check_out_date,
+                total_price=self.booking.total_price
+            )
+        
+        self.assertEqual(context.exception.__cause__.diag.constraint_name, 'booking_no_overlap_room')
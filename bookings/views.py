@@ -1,24 +1,60 @@
+from collections import namedtuple
 from rest_framework import viewsets, permissions, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.utils import timezone
-from django.db.models import Q
+from django.db.models import Prefetch, Q
 from django_filters.rest_framework import DjangoFilterBackend
 
 from .models import Booking, Payment
-from .serializers import BookingSerializer, PaymentSerializer
+from .serializers import BookingDetailSerializer, BookingListSerializer, PaymentSerializer
+from core.pagination import CachedCountPagination
 from hotels.models import Room
 from users.permissions import IsCustomer, IsHotelManager
 
 
-class BookingViewSet(viewsets.ModelViewSet):
+# Statuses from which a booking can no longer be cancelled
+_NON_CANCELLABLE = frozenset({
+    Booking.STATUS_CHECKED_OUT, Booking.STATUS_CANCELLED, Booking.STATUS_NO_SHOW
+})
+
+UserRole = namedtuple('UserRole', ['is_staff', 'is_manager', 'hotel_ids'])
+
+
+class UserRoleMixin:
+    """
+    Resolve the requesting user's role once per request.
+    
+    DRF calls get_queryset() several times per request, so the role and the
+    managed hotel ids are memoized on the view instance.
+    """
+    
+    def get_user_role(self):
+        if getattr(self, '_role', None) is None:
+            self._role = self._compute_role()
+        return self._role
+    
+    def _compute_role(self):
+        user = self.request.user
+        if user.is_staff or user.is_superuser:
+            return UserRole(is_staff=True, is_manager=False, hotel_ids=())
+        if user.is_hotel_manager():
+            # Managers are linked to their hotel through User.hotel, so the
+            # id is already loaded with the user row
+            hotel_ids = (user.hotel_id,) if user.hotel_id else ()
+            return UserRole(is_staff=False, is_manager=True, hotel_ids=hotel_ids)
+        return UserRole(is_staff=False, is_manager=False, hotel_ids=())
+
+
+class BookingViewSet(UserRoleMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing bookings.
     
     Customers can view, create, and manage their own bookings.
     Hotel managers can view and manage bookings for their hotels.
     """
-    serializer_class = BookingSerializer
+    serializer_class = BookingDetailSerializer
+    pagination_class = CachedCountPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['status', 'payment_status', 'hotel', 'room', 'booking_source']
     search_fields = ['booking_number', 'special_requests', 'user__username', 'user__email']
@@ -28,26 +64,38 @@ class BookingViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         user = self.request.user
         
-        # Add computed fields
-        queryset = Booking.objects.all()
-        queryset = queryset.annotate_duration_days()
-        queryset = queryset.annotate_balance_due()
-        queryset = queryset.annotate_is_upcoming()
-        queryset = queryset.annotate_is_active()
+        if self.action == 'list':
+            queryset = Booking.objects.with_related()
+        else:
+            # Only the detail serializer nests the hotel and room type
+            queryset = Booking.objects.select_related(
+                'user', 'hotel', 'hotel__location', 'room', 'room__room_type'
+            ).prefetch_related(
+                'room__room_type__amenities',
+                'room__room_type__images',
+                Prefetch('payments', queryset=Payment.objects.filter(status=Payment.STATUS_COMPLETED))
+            )
         
         # Filter based on user role
-        if user.is_staff or user.is_superuser:
+        role = self.get_user_role()
+        if role.is_staff:
             return queryset
-        elif hasattr(user, 'hotel_manager'):
+        elif role.is_manager:
             # Hotel managers can only see bookings for their hotels
-            return queryset.filter(hotel__in=user.hotel_manager.hotels.all())
+            return queryset.filter(hotel_id__in=role.hotel_ids)
         else:
             # Regular users can only see their own bookings
             return queryset.filter(user=user)
     
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return BookingListSerializer
+        return BookingDetailSerializer
+    
     def perform_create(self, serializer):
         # Set the user to the current user if not provided
-        if not self.request.user.is_staff and not hasattr(self.request.user, 'hotel_manager'):
+        role = self.get_user_role()
+        if not role.is_staff and not role.is_manager:
             serializer.save(user=self.request.user)
         else:
             serializer.save()
@@ -65,9 +113,9 @@ class BookingViewSet(viewsets.ModelViewSet):
         
         booking.status = Booking.STATUS_CONFIRMED
         booking.confirmed_at = timezone.now()
-        booking.save()
+        booking.save(update_fields=['status', 'confirmed_at', 'updated_at'])
         
-        return Response(BookingSerializer(booking).data)
+        return Response(self.get_serializer(booking).data)
     
     @action(detail=True, methods=['post'])
     def check_in(self, request, pk=None):
@@ -82,9 +130,9 @@ class BookingViewSet(viewsets.ModelViewSet):
         
         booking.status = Booking.STATUS_CHECKED_IN
         booking.checked_in_at = timezone.now()
-        booking.save()
+        booking.save(update_fields=['status', 'checked_in_at', 'updated_at'])
         
-        return Response(BookingSerializer(booking).data)
+        return Response(self.get_serializer(booking).data)
     
     @action(detail=True, methods=['post'])
     def check_out(self, request, pk=None):
@@ -99,16 +147,16 @@ class BookingViewSet(viewsets.ModelViewSet):
         
         booking.status = Booking.STATUS_CHECKED_OUT
         booking.checked_out_at = timezone.now()
-        booking.save()
+        booking.save(update_fields=['status', 'checked_out_at', 'updated_at'])
         
-        return Response(BookingSerializer(booking).data)
+        return Response(self.get_serializer(booking).data)
     
     @action(detail=True, methods=['post'])
     def cancel(self, request, pk=None):
         """Cancel a booking."""
         booking = self.get_object()
         
-        if booking.status in [Booking.STATUS_CHECKED_OUT, Booking.STATUS_CANCELLED, Booking.STATUS_NO_SHOW]:
+        if booking.status in _NON_CANCELLABLE:
             return Response(
                 {"detail": f"Cannot cancel booking with status '{booking.status}'."},
                 status=status.HTTP_400_BAD_REQUEST
@@ -116,9 +164,9 @@ class BookingViewSet(viewsets.ModelViewSet):
         
         booking.status = Booking.STATUS_CANCELLED
         booking.cancelled_at = timezone.now()
-        booking.save()
+        booking.save(update_fields=['status', 'cancelled_at', 'updated_at'])
         
-        return Response(BookingSerializer(booking).data)
+        return Response(self.get_serializer(booking).data)
     
     @action(detail=True, methods=['post'])
     def mark_no_show(self, request, pk=None):
@@ -132,12 +180,12 @@ class BookingViewSet(viewsets.ModelViewSet):
             )
         
         booking.status = Booking.STATUS_NO_SHOW
-        booking.save()
+        booking.save(update_fields=['status', 'updated_at'])
         
-        return Response(BookingSerializer(booking).data)
+        return Response(self.get_serializer(booking).data)
 
 
-class PaymentViewSet(viewsets.ModelViewSet):
+class PaymentViewSet(UserRoleMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing payments.
     
@@ -152,13 +200,23 @@ class PaymentViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         user = self.request.user
+        queryset = Payment.objects.select_related('booking')
+        
+        # Reads only need the columns the payment serializer renders; writes
+        # keep full rows so save() still updates every field
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.only(
+                'id', 'amount', 'status', 'payment_method', 'payment_date',
+                'transaction_id', 'notes', 'booking', 'booking__booking_number',
+                'booking__user_id', 'booking__hotel_id'
+            )
         
-        if user.is_staff or user.is_superuser:
-            return Payment.objects.all()
-        elif hasattr(user, 'hotel_manager'):
+        role = self.get_user_role()
+        if role.is_staff:
+            return queryset
+        elif role.is_manager:
             # Hotel managers can only see payments for their hotels
-            managed_hotels = user.hotel_manager.hotels.all()
-            return Payment.objects.filter(booking__hotel__in=managed_hotels)
+            return queryset.filter(booking__hotel_id__in=role.hotel_ids)
         else:
             # Regular users can only see their own payments
-            return Payment.objects.filter(booking__user=user)
\ No newline at end of file
+            return queryset.filter(booking__user=user)
@@ -1,8 +1,24 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from django.core.cache import cache
 from django.db import connection
 
+# Load balancers probe the health endpoint every few seconds; share one
+# database check across probes for this many seconds.
+DB_HEALTH_CACHE_TIMEOUT = 5
+
+
+def _probe_database():
+    """Check that the default database connection is usable."""
+    try:
+        connection.ensure_connection()
+        if not connection.is_usable():
+            return "error: connection is not usable"
+        return "ok"
+    except Exception as e:
+        return f"error: {str(e)}"
+
 
 class HealthCheckView(APIView):
     """
@@ -13,15 +29,14 @@ class HealthCheckView(APIView):
     def get(self, request, format=None):
         # Check database connection
         try:
-            with connection.cursor() as cursor:
-                cursor.execute("SELECT 1")
-                db_status = "ok"
-        except Exception as e:
-            db_status = f"error: {str(e)}"
+            db_status = cache.get_or_set('health:db', _probe_database, timeout=DB_HEALTH_CACHE_TIMEOUT)
+        except Exception:
+            # The cache (e.g. Redis) is down; the health check must still answer
+            db_status = _probe_database()
         
         data = {
             "status": "ok",
             "database": db_status,
             "version": "1.0.0",
         }
-        return Response(data, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response(data, status=status.HTTP_200_OK)
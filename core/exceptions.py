@@ -6,6 +6,7 @@ from rest_framework.views import exception_handler
 from rest_framework.response import Response
 from rest_framework import status
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 import logging
 
 logger = logging.getLogger(__name__)
@@ -127,14 +128,12 @@ def custom_exception_handler(exc, context):
             
             response.data = custom_response_data
     
-    # Add request ID for tracking
+    # Add request ID and timestamp for tracking
+    extra = {}
     if hasattr(context['request'], 'META'):
-        request_id = context['request'].META.get('HTTP_X_REQUEST_ID', 'unknown')
-        response.data['request_id'] = request_id
-    
-    # Add timestamp
-    from django.utils import timezone
-    response.data['timestamp'] = timezone.now().isoformat()
+        extra['request_id'] = context['request'].META.get('HTTP_X_REQUEST_ID', 'unknown')
+    extra['timestamp'] = timezone.now().isoformat()
+    response.data = {**response.data, **extra}
     
     return response
 
@@ -146,8 +145,6 @@ class ValidationMixin:
     
     def validate_future_date(self, date_value, field_name="date"):
         """Validate that a date is in the future."""
-        from django.utils import timezone
-        
         if date_value < timezone.now().date():
             raise ValidationError(f"{field_name.title()} cannot be in the past.")
         return date_value
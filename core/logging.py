@@ -10,8 +10,8 @@ def log_booking_activity(booking, action, user=None, details=None):
     extra_data = {
         'booking_id': booking.id,
         'booking_number': booking.booking_number,
-        'hotel_id': booking.hotel.id,
-        'user_id': booking.user.id,
+        'hotel_id': booking.hotel_id,
+        'user_id': booking.user_id,
         'action': action,
         'actor_id': user.id if user else None,
     }
@@ -25,12 +25,27 @@ def log_booking_activity(booking, action, user=None, details=None):
     )
 
 
+def _get_booking_number(payment):
+    """Return the payment's booking number without loading the whole booking."""
+    # Reuse the related booking if it was already loaded (e.g. select_related)
+    if payment.__class__.booking.is_cached(payment):
+        return payment.booking.booking_number
+    
+    if not hasattr(payment, '_booking_number'):
+        from bookings.models import Booking
+        payment._booking_number = Booking.objects.values_list(
+            'booking_number', flat=True
+        ).get(pk=payment.booking_id)
+    return payment._booking_number
+
+
 def log_payment_activity(payment, action, user=None, details=None):
     """Log payment-related activities."""
+    booking_number = _get_booking_number(payment)
     extra_data = {
         'payment_id': payment.id,
-        'booking_id': payment.booking.id,
-        'booking_number': payment.booking.booking_number,
+        'booking_id': payment.booking_id,
+        'booking_number': booking_number,
         'amount': str(payment.amount),
         'payment_method': payment.payment_method,
         'action': action,
@@ -41,7 +56,7 @@ def log_payment_activity(payment, action, user=None, details=None):
         extra_data['details'] = details
     
     logger.info(
-        f"Payment {action}: {payment.id} for booking {payment.booking.booking_number}",
+        f"Payment {action}: {payment.id} for booking {booking_number}",
         extra=extra_data
     )
 
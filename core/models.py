@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.signals import post_save, pre_save
 from django.utils import timezone
 
 
@@ -14,6 +15,64 @@ class TimeStampedModel(models.Model):
         abstract = True
 
 
+def soft_delete_fields(model):
+    """
+    Return the columns a soft delete writes for the given model.
+    """
+    fields = ['is_deleted', 'deleted_at']
+    if any(field.name == 'updated_at' for field in model._meta.concrete_fields):
+        fields.append('updated_at')
+    return fields
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+    """
+    A QuerySet that can soft delete all of its rows with a single UPDATE.
+    """
+    
+    def soft_delete(self):
+        """
+        Soft delete all rows in the queryset by setting is_deleted=True and deleted_at=now.
+        
+        The rows are written with one UPDATE, but pre_save and post_save are
+        still sent for each instance so receivers see the change.
+        """
+        now = timezone.now()
+        update_fields = soft_delete_fields(self.model)
+        values = {field: now for field in update_fields}
+        values['is_deleted'] = True
+        
+        with transaction.atomic(using=self.db):
+            instances = list(self)
+            if not instances:
+                return 0
+            
+            for instance in instances:
+                for field, value in values.items():
+                    setattr(instance, field, value)
+                pre_save.send(
+                    sender=self.model, instance=instance, raw=False,
+                    using=self.db, update_fields=frozenset(update_fields)
+                )
+            
+            count = self.model._base_manager.using(self.db).filter(
+                pk__in=[instance.pk for instance in instances]
+            ).update(**values)
+            
+            for instance in instances:
+                post_save.send(
+                    sender=self.model, instance=instance, created=False,
+                    update_fields=frozenset(update_fields), raw=False, using=self.db
+                )
+        return count
+    
+    def hard_delete(self):
+        """
+        Permanently delete all rows in the queryset from the database.
+        """
+        return super().delete()
+
+
 class SoftDeleteModel(models.Model):
     """
     An abstract base class model that provides soft delete functionality.
@@ -21,6 +80,8 @@ class SoftDeleteModel(models.Model):
     is_deleted = models.BooleanField(default=False)
     deleted_at = models.DateTimeField(null=True, blank=True)
     
+    objects = SoftDeleteQuerySet.as_manager()
+    
     class Meta:
         abstract = True
     
@@ -30,7 +91,8 @@ class SoftDeleteModel(models.Model):
         """
         self.is_deleted = True
         self.deleted_at = timezone.now()
-        self.save()
+        # Write only the soft delete columns (and updated_at) instead of the whole row
+        self.save(using=using, update_fields=soft_delete_fields(type(self)))
     
     def hard_delete(self, using=None, keep_parents=False):
         """
@@ -1,7 +1,44 @@
-from django.db import models
+import hashlib
+from django.db import connections, models
+from django.db.models import F, Func, Prefetch, Value
+from django.db.models.functions import Concat
 from django.core.cache import cache
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
+from .models import SoftDeleteQuerySet
+
+
+CACHE_VERSION_KEY = 'cacheversion:{model}'
+
+# Reviews shown on a hotel detail page
+DETAIL_REVIEW_COUNT = 5
+
+# A review author's display name as rendered by ReviewSerializer; annotate
+# it as user_name instead of loading the User row
+REVIEW_USER_NAME = Concat('user__first_name', Value(' '), 'user__last_name')
+
+
+def get_cache_version(model_name):
+    """Return the current cache version for a model."""
+    return cache.get_or_set(CACHE_VERSION_KEY.format(model=model_name), 1, timeout=None)
+
+
+def bump_cache_version(model_name):
+    """Orphan every cache entry built against the model's current version."""
+    key = CACHE_VERSION_KEY.format(model=model_name)
+    cache.add(key, 1, timeout=None)
+    cache.incr(key)
+
+
+def query_cache_key(queryset, key_prefix=''):
+    """Build a cache key for a queryset's SQL under its model's current version."""
+    model_name = queryset.model.__name__
+    version = get_cache_version(model_name)
+    # hash() is salted per process; key on a stable digest of the SQL so
+    # every worker shares the same entries
+    sql, params = queryset.query.sql_with_params()
+    digest = hashlib.blake2b(f"{sql}|{params}".encode(), digest_size=16).hexdigest()
+    return f"{key_prefix}{model_name}:{version}:{digest}"
 
 
 class CachedQuerySetMixin:
@@ -15,7 +52,7 @@ class CachedQuerySetMixin:
             timeout: Cache timeout in seconds (default: 1 hour)
             key_prefix: Optional prefix for cache key
         """
-        cache_key = f"{key_prefix}{self.model.__name__}_{hash(str(self.query))}"
+        cache_key = query_cache_key(self, key_prefix)
         
         result = cache.get(cache_key)
         if result is None:
@@ -25,20 +62,69 @@ class CachedQuerySetMixin:
         return result
 
 
-class OptimizedHotelQuerySet(models.QuerySet, CachedQuerySetMixin):
+class OptimizedHotelQuerySet(SoftDeleteQuerySet, CachedQuerySetMixin):
     """Optimized queryset for Hotel model."""
     
+    def with_list_related(self):
+        """Load the relations rendered in hotel lists: location and primary image."""
+        from hotels.models import HotelImage
+        return self.select_related('location').prefetch_related(
+            Prefetch(
+                'images',
+                queryset=HotelImage.objects.filter(is_primary=True, is_deleted=False).only(
+                    'id', 'hotel', 'image', 'caption', 'is_primary'
+                ).order_by('pk'),
+                to_attr='primary_images'
+            )
+        )
+    
+    def with_total_rooms(self):
+        """Annotate each hotel's room count, read by Hotel.total_rooms."""
+        # distinct so further joins (e.g. reviews) cannot multiply the count
+        return self.annotate(total_rooms=models.Count('rooms', distinct=True))
+    
+    def with_detail_related(self):
+        """Load every relation rendered on the hotel detail page."""
+        from hotels.models import Amenity, HotelImage, Review, RoomImage, RoomType
+        return self.select_related('location').prefetch_related(
+            Prefetch(
+                'amenities',
+                queryset=Amenity.objects.filter(is_deleted=False).only('id', 'name', 'description', 'icon')
+            ),
+            Prefetch(
+                'images',
+                queryset=HotelImage.objects.filter(is_deleted=False).only(
+                    'id', 'hotel', 'image', 'caption', 'is_primary'
+                )
+            ),
+            Prefetch(
+                'room_types',
+                queryset=RoomType.objects.filter(is_deleted=False).prefetch_related(
+                    Prefetch(
+                        'amenities',
+                        queryset=Amenity.objects.filter(is_deleted=False).only('id', 'name', 'description', 'icon')
+                    ),
+                    Prefetch(
+                        'images',
+                        queryset=RoomImage.objects.filter(is_deleted=False).only(
+                            'id', 'room_type', 'image', 'caption', 'is_primary'
+                        )
+                    ),
+                )
+            ),
+            # Only the latest reviews are rendered; the slice is applied per hotel
+            Prefetch(
+                'reviews',
+                queryset=Review.objects.filter(is_approved=True, is_deleted=False).only(
+                    'id', 'hotel', 'user', 'rating', 'title', 'comment', 'stay_date', 'created_at'
+                ).annotate(user_name=REVIEW_USER_NAME).order_by('-created_at')[:DETAIL_REVIEW_COUNT],
+                to_attr='recent_reviews'
+            ),
+        )
+    
     def with_related(self):
         """Prefetch related objects to reduce database queries."""
-        return self.select_related(
-            'location'
-        ).prefetch_related(
-            'amenities',
-            'images',
-            'room_types__amenities',
-            'room_types__images',
-            'reviews__user'
-        )
+        return self.with_detail_related()
     
     def active(self):
         """Filter only active hotels."""
@@ -71,14 +157,50 @@ class OptimizedHotelQuerySet(models.QuerySet, CachedQuerySetMixin):
         return self.filter(amenities__id__in=amenity_ids).distinct()
 
 
-class OptimizedBookingQuerySet(models.QuerySet, CachedQuerySetMixin):
+class OptimizedBookingQuerySet(SoftDeleteQuerySet, CachedQuerySetMixin):
     """Optimized queryset for Booking model."""
     
+    # Columns rendered in booking lists; joined rows carry only their labels
+    LIST_FIELDS = (
+        'id', 'booking_number', 'user', 'hotel', 'room', 'check_in_date', 'check_out_date',
+        'adults', 'children', 'special_requests', 'status', 'payment_status', 'booking_source',
+        'total_price', 'paid_amount', 'confirmed_at', 'checked_in_at', 'checked_out_at',
+        'cancelled_at', 'created_at',
+        'user__email', 'hotel__name', 'room__room_number',
+        'room__room_type__name', 'room__room_type__base_price',
+    )
+    
     def with_related(self):
-        """Prefetch related objects."""
+        """Join the related rows needed for listing, loading only the rendered columns."""
         return self.select_related(
             'user', 'hotel', 'room', 'room__room_type'
-        ).prefetch_related('payments')
+        ).only(*self.LIST_FIELDS)
+    
+    def overlapping(self, check_in_date, check_out_date):
+        """
+        Filter bookings whose stay overlaps the given [check_in, check_out) range.
+        
+        On PostgreSQL this is a single daterange && test that can use the
+        booking_stay_gist_idx expression index; other backends compare the
+        two date columns.
+        """
+        if connections[self.db].vendor != 'postgresql':
+            return self.filter(
+                check_in_date__lt=check_out_date,
+                check_out_date__gt=check_in_date
+            )
+        
+        from django.contrib.postgres.fields import DateRangeField
+        from django.db.backends.postgresql.psycopg_any import DateRange
+        
+        # Must match the expression of booking_stay_gist_idx exactly
+        return self.annotate(
+            stay=Func(
+                F('check_in_date'), F('check_out_date'), Value('[)'),
+                function='daterange',
+                output_field=DateRangeField()
+            )
+        ).filter(stay__overlap=DateRange(check_in_date, check_out_date, '[)'))
     
     def upcoming(self):
         """Filter upcoming bookings."""
@@ -110,30 +232,26 @@ class OptimizedBookingQuerySet(models.QuerySet, CachedQuerySetMixin):
 
 
 # Cache invalidation signals
+NON_INVALIDATING_FIELDS = frozenset({'last_login', 'updated_at'})
+
+# Models whose cache version is read by a cached query, page or ETag
+CACHED_MODELS = frozenset({
+    'Amenity', 'Booking', 'Hotel', 'HotelImage', 'Location', 'Payment', 'Room', 'RoomImage', 'RoomType',
+})
+
+
 @receiver([post_save, post_delete])
-def invalidate_cache(sender, **kwargs):
+def invalidate_cache(sender, update_fields=None, **kwargs):
     """Invalidate related cache when models change."""
-    model_name = sender.__name__
-    
-    # Clear model-specific cache patterns
-    cache_patterns = [
-        f"{model_name}_*",
-    ]
-    
-    # Add related model patterns
-    if model_name == 'Hotel':
-        cache_patterns.extend([
-            'hotel_list_*',
-            'hotel_detail_*',
-            'featured_hotels_*'
-        ])
-    elif model_name == 'Booking':
-        cache_patterns.extend([
-            'user_bookings_*',
-            'hotel_bookings_*'
-        ])
-    
-    # In production, use more sophisticated cache invalidation
-    # For now, we'll use a simple approach
-    for pattern in cache_patterns:
-        cache.delete_many(cache.keys(pattern))
+    # Nothing is cached against other models, so their writes skip the cache
+    if sender.__name__ not in CACHED_MODELS:
+        return
+    
+    # Saves limited to bookkeeping columns (e.g. the last_login update on
+    # every sign-in) cannot change a cached result
+    if update_fields and update_fields <= NON_INVALIDATING_FIELDS:
+        return
+    
+    # Readers embed the version in their keys, so stale entries are never
+    # looked up again and simply age out of the cache
+    bump_cache_version(sender.__name__)
@@ -0,0 +1,31 @@
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+from rest_framework.pagination import PageNumberPagination
+
+from .optimizations import query_cache_key
+
+# How long a list's total count is reused. Writes to the listed model bump
+# its cache version and invalidate the count straight away; changes to
+# other joined models show up within this window.
+COUNT_CACHE_TIMEOUT = 60
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator that caches the COUNT(*) of its object list."""
+    
+    @cached_property
+    def count(self):
+        object_list = self.object_list
+        if not hasattr(object_list, 'query'):
+            return super().count
+        return cache.get_or_set(
+            query_cache_key(object_list, 'count:'),
+            lambda: object_list.count(),
+            COUNT_CACHE_TIMEOUT,
+        )
+
+
+class CachedCountPagination(PageNumberPagination):
+    """Page number pagination that skips the COUNT(*) on repeat page loads."""
+    django_paginator_class = CachedCountPaginator
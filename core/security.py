@@ -2,8 +2,49 @@ from django.core.exceptions import PermissionDenied
 from django.utils.deprecation import MiddlewareMixin
 from django.http import HttpResponseForbidden
 from django.core.cache import cache
-import time
+from django.db import router, transaction
+from contextlib import contextmanager
+from copy import deepcopy
+from functools import lru_cache
 import hashlib
+import threading
+from core.logging import logger
+
+try:
+    from django_redis import get_redis_connection
+except ImportError:  # django-redis is optional
+    get_redis_connection = None
+
+# One-pass equivalent of html.escape() followed by stripping <>"';\ from
+# the result (which also drops the entities' trailing semicolons)
+_SANITIZE_TABLE = str.maketrans({
+    '&': '&amp',
+    '<': '&lt',
+    '>': '&gt',
+    '"': '&quot',
+    "'": '&#x27',
+    ';': None,
+    '\\': None,
+})
+
+# Headers added to every response by SecurityHeadersMiddleware
+_SECURITY_HEADERS = (
+    ('X-Content-Type-Options', 'nosniff'),
+    ('X-Frame-Options', 'DENY'),
+    ('X-XSS-Protection', '1; mode=block'),
+    ('Referrer-Policy', 'strict-origin-when-cross-origin'),
+)
+_CSP_HEADER = (
+    "default-src 'self'; "
+    "script-src 'self' 'unsafe-inline' cdn.jsdelivr.net cdnjs.cloudflare.com; "
+    "style-src 'self' 'unsafe-inline' cdn.jsdelivr.net cdnjs.cloudflare.com; "
+    "img-src 'self' data: https:; "
+    "font-src 'self' cdnjs.cloudflare.com;"
+)
+
+# Requests allowed per client IP in each fixed window
+RATE_LIMIT_REQUESTS = 60
+RATE_LIMIT_WINDOW = 60  # seconds
 
 
 class RateLimitMiddleware(MiddlewareMixin):
@@ -14,99 +55,189 @@ class RateLimitMiddleware(MiddlewareMixin):
         if request.user.is_authenticated and request.user.is_staff:
             return None
         
-        # Get client IP
-        ip = self.get_client_ip(request)
-        
-        # Create cache key
-        cache_key = f"rate_limit_{ip}"
-        
-        # Get current request count and timestamp
-        request_data = cache.get(cache_key, {'count': 0, 'start_time': time.time()})
-        
-        # Reset if more than 1 minute has passed
-        if time.time() - request_data['start_time'] > 60:
-            request_data = {'count': 1, 'start_time': time.time()}
-        else:
-            request_data['count'] += 1
+        key = f"rl:{self.get_client_ip(request)}"
         
         # Check if rate limit exceeded (60 requests per minute)
-        if request_data['count'] > 60:
+        if self.increment(key) > RATE_LIMIT_REQUESTS:
             return HttpResponseForbidden("Rate limit exceeded")
         
-        # Update cache
-        cache.set(cache_key, request_data, 60)
-        
         return None
     
+    def increment(self, key):
+        """Count a request against key, starting the window on the first hit."""
+        if get_redis_connection is not None and cache.__class__.__module__.startswith('django_redis'):
+            # INCR and EXPIRE NX in one round trip; the TTL closes the window
+            pipe = get_redis_connection('default').pipeline()
+            pipe.incr(key)
+            pipe.expire(key, RATE_LIMIT_WINDOW, nx=True)
+            count, _ = pipe.execute()
+            return count
+        
+        if cache.add(key, 1, RATE_LIMIT_WINDOW):
+            return 1
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # The window expired between add() and incr()
+            cache.set(key, 1, RATE_LIMIT_WINDOW)
+            return 1
+    
     def get_client_ip(self, request):
-        """Get the client's IP address."""
+        """Get the client's IP address, remembered on the request after the first call."""
+        try:
+            return request._client_ip
+        except AttributeError:
+            pass
         x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
         if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
+            ip = x_forwarded_for.partition(',')[0].strip()
         else:
             ip = request.META.get('REMOTE_ADDR')
+        request._client_ip = ip
         return ip
 
 
+_audit_local = threading.local()
+
+
+@contextmanager
+def deferred_audit():
+    """
+    Collect AuditMixin events raised inside the block and log them as one
+    batch on exit. Nested blocks join the outermost batch.
+    """
+    if getattr(_audit_local, 'events', None) is not None:
+        yield
+        return
+    
+    _audit_local.events = []
+    try:
+        yield
+    finally:
+        events, _audit_local.events = _audit_local.events, None
+        flush_audit_events(events)
+
+
+def flush_audit_events(events):
+    """Log a batch of collected audit events with a single call."""
+    if not events:
+        return
+    
+    logger.info(
+        f"Audit: {len(events)} events",
+        extra={'audit_events': events}
+    )
+
+
+class AuditContextMiddleware:
+    """Batch the audit events of each request into one log write."""
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        _audit_local.events = []
+        try:
+            return self.get_response(request)
+        finally:
+            # Flush even when the view raises, so its events are not lost
+            # or carried into the next request on this thread
+            events, _audit_local.events = _audit_local.events, None
+            flush_audit_events(events)
+
+
 class SecurityHeadersMiddleware(MiddlewareMixin):
     """Add security headers to responses."""
     
     def process_response(self, request, response):
         # Add security headers
-        response['X-Content-Type-Options'] = 'nosniff'
-        response['X-Frame-Options'] = 'DENY'
-        response['X-XSS-Protection'] = '1; mode=block'
-        response['Referrer-Policy'] = 'strict-origin-when-cross-origin'
+        headers = response.headers
+        for name, value in _SECURITY_HEADERS:
+            headers[name] = value
         
         # Add CSP header for HTML responses
-        if response.get('Content-Type', '').startswith('text/html'):
-            response['Content-Security-Policy'] = (
-                "default-src 'self'; "
-                "script-src 'self' 'unsafe-inline' cdn.jsdelivr.net cdnjs.cloudflare.com; "
-                "style-src 'self' 'unsafe-inline' cdn.jsdelivr.net cdnjs.cloudflare.com; "
-                "img-src 'self' data: https:; "
-                "font-src 'self' cdnjs.cloudflare.com;"
-            )
+        if headers.get('Content-Type', '').startswith('text/html'):
+            headers['Content-Security-Policy'] = _CSP_HEADER
         
         return response
 
 
 def hash_sensitive_data(data):
-    """Hash sensitive data for logging or storage."""
-    return hashlib.sha256(str(data).encode()).hexdigest()[:10]
+    """Hash sensitive data to a short label for logging or storage."""
+    if not isinstance(data, bytes):
+        data = (data if isinstance(data, str) else str(data)).encode()
+    # A 5 byte digest gives the same 10 hex characters without hashing to 32 bytes and slicing
+    return hashlib.blake2b(data, digest_size=5).hexdigest()
 
 
 def sanitize_user_input(input_string):
     """Basic sanitization of user input."""
-    import html
-    import re
-    
-    # HTML escape
-    sanitized = html.escape(input_string)
-    
-    # Remove potentially dangerous characters
-    sanitized = re.sub(r'[<>"\';\\]', '', sanitized)
-    
-    return sanitized.strip()
+    # HTML escape and remove potentially dangerous characters in one pass
+    return input_string.translate(_SANITIZE_TABLE).strip()
+
+
+# Fields whose audited values are hashed instead of logged
+_SENSITIVE_AUDIT_FIELDS = frozenset({'password', 'email', 'phone_number'})
+
+# Column value types that can be changed in place and are copied into snapshots
+_MUTABLE_TYPES = (dict, list, set, bytearray)
+
+
+@lru_cache(maxsize=None)
+def _audit_fields(model):
+    """Return (attname, name, is_sensitive) for each concrete field of an audited model."""
+    return tuple(
+        (field.attname, field.name, field.name in _SENSITIVE_AUDIT_FIELDS)
+        for field in model._meta.concrete_fields
+    )
 
 
 class AuditMixin:
     """Mixin to add audit trail to models."""
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded values so save() can diff without re-reading the row
+        instance._audit_snapshot = instance.get_audit_snapshot()
+        return instance
+    
+    def get_audit_snapshot(self):
+        """Return the loaded (non-deferred) column values keyed by attname."""
+        values = self.__dict__
+        snapshot = {}
+        for attname, _, _ in _audit_fields(type(self)):
+            if attname in values:
+                value = values[attname]
+                # Copy mutable values (e.g. JSONField dicts) so in-place
+                # edits still show up as changes
+                snapshot[attname] = deepcopy(value) if isinstance(value, _MUTABLE_TYPES) else value
+        return snapshot
+    
     def save(self, *args, **kwargs):
-        # Log model changes
-        if hasattr(self, 'pk') and self.pk:
-            action = 'UPDATE'
-            try:
-                old_instance = self.__class__.objects.get(pk=self.pk)
-                changes = self.get_field_changes(old_instance)
-            except self.__class__.DoesNotExist:
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        # Diff and write in one transaction so the logged changes are
+        # against the row version this save replaces
+        with transaction.atomic(using=using):
+            # Log model changes
+            if hasattr(self, 'pk') and self.pk:
+                action = 'UPDATE'
+                snapshot = getattr(self, '_audit_snapshot', None)
+                if snapshot is None:
+                    # Not loaded through the ORM; read and lock the row
+                    try:
+                        snapshot = self.__class__._base_manager.using(using).select_for_update().get(
+                            pk=self.pk
+                        )._audit_snapshot
+                    except self.__class__.DoesNotExist:
+                        snapshot = {}
+                changes = self.get_field_changes(snapshot)
+            else:
+                action = 'CREATE'
                 changes = {}
-        else:
-            action = 'CREATE'
-            changes = {}
-        
-        super().save(*args, **kwargs)
+            
+            super().save(*args, **kwargs)
+        self._audit_snapshot = self.get_audit_snapshot()
         
         # Log the action (implement your logging here)
         self.log_audit_event(action, changes)
@@ -116,17 +247,19 @@ class AuditMixin:
         self.log_audit_event('DELETE', {})
         super().delete(*args, **kwargs)
     
-    def get_field_changes(self, old_instance):
-        """Compare field values to detect changes."""
+    def get_field_changes(self, snapshot):
+        """Compare current field values with a snapshot to detect changes."""
         changes = {}
-        for field in self._meta.fields:
-            field_name = field.name
-            old_value = getattr(old_instance, field_name)
-            new_value = getattr(self, field_name)
+        values = self.__dict__
+        for attname, field_name, sensitive in _audit_fields(type(self)):
+            if attname not in snapshot or attname not in values:
+                continue
+            old_value = snapshot[attname]
+            new_value = values[attname]
             
             if old_value != new_value:
                 # Hash sensitive fields
-                if field_name in ['password', 'email', 'phone_number']:
+                if sensitive:
                     changes[field_name] = {
                         'old': hash_sensitive_data(old_value),
                         'new': hash_sensitive_data(new_value)
@@ -141,14 +274,20 @@ class AuditMixin:
     
     def log_audit_event(self, action, changes):
         """Log audit event (implement based on your logging system)."""
-        from core.logging import logger
+        event = {
+            'model': self.__class__.__name__,
+            'instance_id': getattr(self, 'pk', None),
+            'action': action,
+            'changes': changes
+        }
+        
+        # Inside a request or deferred_audit() block, defer to the batch
+        events = getattr(_audit_local, 'events', None)
+        if events is not None:
+            events.append(event)
+            return
         
         logger.info(
             f"Audit: {action} on {self.__class__.__name__}",
-            extra={
-                'model': self.__class__.__name__,
-                'instance_id': getattr(self, 'pk', None),
-                'action': action,
-                'changes': changes
-            }
+            extra=event
         )
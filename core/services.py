@@ -3,11 +3,18 @@ Service layer for business logic separation.
 This prepares the application for potential microservices architecture.
 """
 
+from django.core.cache import cache
 from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Q, Sum
 from django.utils import timezone
 from typing import Optional, List, Dict
-from .models import Booking, Payment, Hotel, Room
+from bookings.models import Booking, Payment
+from hotels.models import Hotel, Room
 from .exceptions import BookingError, PaymentError
+from .optimizations import get_cache_version
+
+# Booking statistics on the analytics page may lag writes by this long
+HOTEL_ANALYTICS_TIMEOUT = 300
 
 
 class BookingService:
@@ -45,7 +52,7 @@ class BookingService:
             )
             
             # Send confirmation email (async)
-            from .tasks import send_booking_confirmation_email
+            from bookings.tasks import send_booking_confirmation_email
             send_booking_confirmation_email.delay(booking.id)
             
             return booking
@@ -84,26 +91,21 @@ class BookingService:
     def get_available_rooms(hotel_id: int, check_in_date, 
                           check_out_date) -> List[Room]:
         """Get available rooms for given dates."""
-        # Get all rooms for the hotel
-        rooms = Room.objects.filter(
-            hotel_id=hotel_id, 
-            is_available=True
-        ).select_related('room_type')
-        
-        # Filter out rooms with conflicting bookings
-        available_rooms = []
-        for room in rooms:
-            conflicting_bookings = Booking.objects.filter(
-                room=room,
-                status__in=['confirmed', 'checked_in'],
-                check_in_date__lt=check_out_date,
-                check_out_date__gt=check_in_date
-            )
-            
-            if not conflicting_bookings.exists():
-                available_rooms.append(room)
+        # Bookings that overlap the requested stay, as a single subquery
+        conflicting = Booking.objects.overlapping(
+            check_in_date, check_out_date
+        ).filter(
+            status__in=['confirmed', 'checked_in']
+        ).values('room_id')
         
-        return available_rooms
+        return list(
+            Room.objects.filter(
+                hotel_id=hotel_id,
+                is_available=True
+            ).exclude(
+                id__in=conflicting
+            ).select_related('room_type')
+        )
 
 
 class PaymentService:
@@ -133,11 +135,10 @@ class PaymentService:
                 status=Payment.STATUS_COMPLETED
             )
             
-            # Update booking payment status
-            booking.record_payment(amount)
+            # Booking paid_amount/payment_status are updated by the Payment post_save signal
             
             # Send receipt email
-            from .tasks import send_payment_receipt_email
+            from bookings.tasks import send_payment_receipt_email
             send_payment_receipt_email.delay(payment.id)
             
             return payment
@@ -162,9 +163,8 @@ class HotelService:
         # Location filter
         if location:
             queryset = queryset.filter(
-                location__city__icontains=location
-            ) | queryset.filter(
-                location__country__icontains=location
+                Q(location__city__icontains=location) |
+                Q(location__country__icontains=location)
             )
         
         # Price filter
@@ -182,20 +182,24 @@ class HotelService:
         
         # Availability filter (if dates provided)
         if check_in_date and check_out_date:
-            available_hotels = []
-            for hotel in queryset:
-                available_rooms = BookingService.get_available_rooms(
-                    hotel.id, check_in_date, check_out_date
-                )
-                # Check if any room can accommodate the guests
-                suitable_rooms = [
-                    room for room in available_rooms 
-                    if room.room_type.max_occupancy >= guests
-                ]
-                if suitable_rooms:
-                    available_hotels.append(hotel)
-            
-            return available_hotels
+            conflict = Booking.objects.overlapping(
+                check_in_date, check_out_date
+            ).filter(
+                room=OuterRef('pk'),
+                status__in=['confirmed', 'checked_in']
+            )
+            # Rooms that are free for the dates and can accommodate the guests
+            suitable = Room.objects.annotate(
+                has_conflict=Exists(conflict)
+            ).filter(
+                hotel=OuterRef('pk'),
+                is_available=True,
+                has_conflict=False,
+                room_type__max_occupancy__gte=guests
+            )
+            queryset = queryset.annotate(
+                has_room=Exists(suitable)
+            ).filter(has_room=True)
         
         return list(queryset)
     
@@ -203,25 +207,38 @@ class HotelService:
     def get_hotel_analytics(hotel_id: int) -> Dict:
         """Get analytics data for a hotel."""
         try:
-            hotel = Hotel.objects.get(id=hotel_id)
-            
-            # Booking statistics
-            total_bookings = hotel.bookings.count()
-            revenue_this_month = hotel.bookings.filter(
-                created_at__year=timezone.now().year,
-                created_at__month=timezone.now().month,
-                payment_status='paid'
-            ).aggregate(
-                total=models.Sum('total_price')
-            )['total'] or 0
+            hotel = Hotel.objects.with_total_rooms().get(id=hotel_id)
+            
+            # Booking statistics and occupancy in a single aggregate query,
+            # cached until a booking or payment changes or the day turns over
+            now = timezone.now()
+            today = now.date()
+            cache_key = (
+                f"hotel:analytics:{hotel.id}:{today}:"
+                f"{get_cache_version('Booking')}:{get_cache_version('Payment')}"
+            )
+            stats = cache.get(cache_key)
+            if stats is None:
+                stats = hotel.bookings.aggregate(
+                    total_bookings=Count('id'),
+                    revenue_this_month=Sum('total_price', filter=Q(
+                        created_at__year=now.year,
+                        created_at__month=now.month,
+                        payment_status='paid'
+                    )),
+                    occupied_rooms=Count('id', filter=Q(
+                        check_in_date__lte=today,
+                        check_out_date__gt=today,
+                        status='checked_in'
+                    ))
+                )
+                cache.set(cache_key, stats, HOTEL_ANALYTICS_TIMEOUT)
+            total_bookings = stats['total_bookings']
+            revenue_this_month = stats['revenue_this_month'] or 0
+            occupied_rooms = stats['occupied_rooms']
             
             # Occupancy rate
-            total_rooms = hotel.rooms.count()
-            occupied_rooms = hotel.bookings.filter(
-                check_in_date__lte=timezone.now().date(),
-                check_out_date__gt=timezone.now().date(),
-                status='checked_in'
-            ).count()
+            total_rooms = hotel.total_rooms
             
             occupancy_rate = (occupied_rooms / total_rooms * 100) if total_rooms > 0 else 0
             
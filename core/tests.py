@@ -0,0 +1,263 @@
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import models
+from django.db.models.signals import post_save, pre_save
+from django.test import RequestFactory, TestCase
+from unittest import mock
+from hotels.models import Hotel, Location, Review
+from users.models import User
+from .optimizations import CACHE_VERSION_KEY, get_cache_version
+from .security import RATE_LIMIT_REQUESTS, AuditContextMiddleware, AuditMixin, RateLimitMiddleware
+
+
+class AuditedRecord(AuditMixin, models.Model):
+    """Audited model used by the AuditMixin tests."""
+    name = models.CharField(max_length=50)
+    preferences = models.JSONField(default=dict)
+    
+    class Meta:
+        app_label = 'core'
+
+
+class SoftDeleteTest(TestCase):
+    """Tests for SoftDeleteModel and SoftDeleteQuerySet."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='testpassword123',
+            first_name='Test',
+            last_name='User'
+        )
+        self.hotels = [
+            Hotel.objects.create(
+                name=f'Hotel {i}',
+                description='A test hotel',
+                location=Location.objects.create(
+                    address=f'{i} Test Street',
+                    city='Lagos',
+                    state='Lagos',
+                    country='Nigeria',
+                    zip_code='100001'
+                ),
+                star_rating=4,
+                contact_email='hotel@example.com',
+                contact_phone='+2340000000'
+            )
+            for i in range(2)
+        ]
+        self.saved = []
+        pre_save.connect(self._record, sender=Hotel, dispatch_uid='soft_delete_test_pre')
+        post_save.connect(self._record, sender=Hotel, dispatch_uid='soft_delete_test_post')
+        self.addCleanup(pre_save.disconnect, sender=Hotel, dispatch_uid='soft_delete_test_pre')
+        self.addCleanup(post_save.disconnect, sender=Hotel, dispatch_uid='soft_delete_test_post')
+    
+    def _record(self, signal, instance, update_fields, **kwargs):
+        self.saved.append((signal, instance.pk, set(update_fields)))
+    
+    def test_instance_delete(self):
+        """Test that delete() soft deletes the row, stamps updated_at and sends save signals."""
+        hotel = self.hotels[0]
+        updated_at = hotel.updated_at
+        
+        hotel.delete()
+        
+        hotel.refresh_from_db()
+        self.assertTrue(hotel.is_deleted)
+        self.assertIsNotNone(hotel.deleted_at)
+        self.assertGreater(hotel.updated_at, updated_at)
+        fields = {'is_deleted', 'deleted_at', 'updated_at'}
+        self.assertEqual(self.saved, [(pre_save, hotel.pk, fields), (post_save, hotel.pk, fields)])
+    
+    def test_queryset_soft_delete(self):
+        """Test that soft_delete() updates every row in one UPDATE and sends save signals per row."""
+        # One SELECT and one UPDATE inside a savepoint
+        with self.assertNumQueries(4):
+            count = Hotel.objects.all().soft_delete()
+        
+        self.assertEqual(count, 2)
+        self.assertEqual(Hotel.objects.filter(is_deleted=True, deleted_at__isnull=False).count(), 2)
+        self.assertEqual(len([entry for entry in self.saved if entry[0] is post_save]), 2)
+        self.assertEqual(len([entry for entry in self.saved if entry[0] is pre_save]), 2)
+    
+    def test_queryset_delete_is_django_delete(self):
+        """Test that QuerySet.delete() keeps Django's behaviour and return value."""
+        deleted, per_model = Hotel.objects.filter(pk=self.hotels[0].pk).delete()
+        
+        self.assertEqual(per_model['hotels.Hotel'], 1)
+        self.assertFalse(Hotel.objects.filter(pk=self.hotels[0].pk).exists())
+    
+    def test_review_soft_delete_refreshes_rating(self):
+        """Test that soft deleting a review refreshes the hotel's stored rating."""
+        hotel = self.hotels[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            review = Review.objects.create(
+                hotel=hotel, user=self.user, rating=4, title='Good', comment='Good stay',
+                stay_date=hotel.created_at.date(), is_approved=True
+            )
+        hotel.refresh_from_db()
+        self.assertEqual((hotel.average_rating, hotel.review_count), (4, 1))
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            review.delete()
+        
+        hotel.refresh_from_db()
+        self.assertEqual((hotel.average_rating, hotel.review_count), (0, 0))
+
+
+class AuditContextMiddlewareTests(TestCase):
+    """Tests for AuditContextMiddleware."""
+    
+    def test_middleware_is_installed(self):
+        """Test that the middleware is part of the request cycle."""
+        self.assertIn('core.security.AuditContextMiddleware', settings.MIDDLEWARE)
+    
+    def test_events_batched_per_request(self):
+        """Test that a request's audit events are logged in one batch."""
+        def view(request):
+            AuditedRecord.objects.create(name='first')
+            AuditedRecord.objects.create(name='second')
+        
+        with self.assertLogs('bookings', 'INFO') as logs:
+            AuditContextMiddleware(view)(RequestFactory().get('/'))
+        
+        self.assertEqual(len(logs.records), 1)
+        self.assertEqual([event['action'] for event in logs.records[0].audit_events], ['CREATE', 'CREATE'])
+    
+    def test_events_flushed_when_view_raises(self):
+        """Test that events are still logged, and not carried over, when the view raises."""
+        def view(request):
+            AuditedRecord.objects.create(name='first')
+            raise ValueError
+        
+        with self.assertLogs('bookings', 'INFO') as logs:
+            with self.assertRaises(ValueError):
+                AuditContextMiddleware(view)(RequestFactory().get('/'))
+            # Outside a request, events are logged straight away
+            AuditedRecord.objects.create(name='second')
+        
+        self.assertEqual(len(logs.records), 2)
+        self.assertEqual(len(logs.records[0].audit_events), 1)
+        self.assertEqual(logs.records[1].model, 'AuditedRecord')
+
+
+class AuditMixinTests(TestCase):
+    """Tests for AuditMixin change detection."""
+    
+    def test_in_place_json_change_is_detected(self):
+        """Test that mutating a loaded JSONField value in place is logged as a change."""
+        AuditedRecord.objects.create(name='record', preferences={'newsletter': False})
+        record = AuditedRecord.objects.get()
+        
+        record.preferences['newsletter'] = True
+        with self.assertLogs('bookings', 'INFO') as logs:
+            record.save()
+        
+        self.assertEqual(logs.records[0].changes, {
+            'preferences': {'old': {'newsletter': False}, 'new': {'newsletter': True}}
+        })
+    
+    def test_unchanged_save_logs_no_changes(self):
+        """Test that saving an unmodified instance logs an empty change set."""
+        AuditedRecord.objects.create(name='record', preferences={'newsletter': False})
+        record = AuditedRecord.objects.get()
+        
+        with self.assertLogs('bookings', 'INFO') as logs:
+            record.save()
+        
+        self.assertEqual(logs.records[0].changes, {})
+
+
+class RateLimitMiddlewareTests(TestCase):
+    """Tests for RateLimitMiddleware."""
+    
+    def setUp(self):
+        cache.clear()
+        self.middleware = RateLimitMiddleware(lambda request: None)
+        self.factory = RequestFactory()
+    
+    def request(self, user=None, **meta):
+        request = self.factory.get('/', **meta)
+        request.user = user or AnonymousUser()
+        return request
+    
+    def test_limit_per_client(self):
+        """Test that a client is refused after the limit while other clients still get through."""
+        for _ in range(RATE_LIMIT_REQUESTS):
+            self.assertIsNone(self.middleware.process_request(self.request()))
+        
+        self.assertEqual(self.middleware.process_request(self.request()).status_code, 403)
+        self.assertIsNone(self.middleware.process_request(self.request(REMOTE_ADDR='10.0.0.2')))
+    
+    def test_forwarded_client_ip(self):
+        """Test that the first X-Forwarded-For address identifies the client."""
+        request = self.request(HTTP_X_FORWARDED_FOR='203.0.113.7, 10.0.0.1')
+        
+        self.assertEqual(self.middleware.get_client_ip(request), '203.0.113.7')
+    
+    def test_expired_window_restarts(self):
+        """Test that the count starts again once the window key has expired."""
+        self.assertEqual(self.middleware.increment('rl:test'), 1)
+        self.assertEqual(self.middleware.increment('rl:test'), 2)
+        
+        cache.delete('rl:test')
+        
+        self.assertEqual(self.middleware.increment('rl:test'), 1)
+    
+    def test_staff_not_limited(self):
+        """Test that staff users are not counted."""
+        staff = User.objects.create_user(
+            email='staff@example.com', password='testpassword', first_name='Staff', last_name='User',
+            is_staff=True
+        )
+        for _ in range(RATE_LIMIT_REQUESTS + 1):
+            self.assertIsNone(self.middleware.process_request(self.request(staff)))
+        
+        self.assertIsNone(cache.get('rl:127.0.0.1'))
+
+
+class CacheInvalidationTests(TestCase):
+    """Tests for the cache version bumps on model writes."""
+    
+    def setUp(self):
+        cache.clear()
+    
+    def test_cached_model_write_bumps_version(self):
+        """Test that saving a model read by cached queries bumps its version."""
+        version = get_cache_version('Location')
+        Location.objects.create(
+            address='1 Test Street', city='Lagos', state='Lagos', country='Nigeria', zip_code='100001'
+        )
+        self.assertEqual(get_cache_version('Location'), version + 1)
+    
+    def test_other_model_write_leaves_cache_alone(self):
+        """Test that writes to models nothing is cached against do not touch the cache."""
+        User.objects.create_user(
+            email='other@example.com', password='testpassword', first_name='Other', last_name='User'
+        )
+        AuditedRecord.objects.create(name='record')
+        
+        self.assertIsNone(cache.get(CACHE_VERSION_KEY.format(model='User')))
+        self.assertIsNone(cache.get(CACHE_VERSION_KEY.format(model='UserProfile')))
+        self.assertIsNone(cache.get(CACHE_VERSION_KEY.format(model='AuditedRecord')))
+
+
+class HealthCheckTests(TestCase):
+    """Tests for the health check endpoint."""
+    
+    def test_health_check(self):
+        """Test that the endpoint reports the database status."""
+        response = self.client.get('/api/health/', HTTP_ACCEPT='application/json')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['database'], 'ok')
+    
+    def test_health_check_without_cache(self):
+        """Test that the endpoint probes the database directly when the cache is down."""
+        with mock.patch('core.api_views.cache.get_or_set', side_effect=ConnectionError('cache down')):
+            response = self.client.get('/api/health/', HTTP_ACCEPT='application/json')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['database'], 'ok')
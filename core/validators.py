@@ -1,7 +1,15 @@
 from rest_framework import serializers
 from django.core.validators import validate_email
 from django.utils import timezone
-from datetime import datetime, timedelta
+import re
+from bookings.models import Booking
+
+_NONDIGIT_RE = re.compile(r'\D')
+
+_MAX_STAY_DAYS = 30
+
+# Disposable email providers rejected at registration
+_BLACKLISTED_EMAIL_DOMAINS = frozenset({'tempmail.com', '10minutemail.com'})
 
 
 class BookingValidationMixin:
@@ -18,23 +26,20 @@ class BookingValidationMixin:
             )
         
         # Check if dates are in the future
-        today = timezone.now().date()
-        if check_in_date < today:
+        if check_in_date < timezone.localdate():
             raise serializers.ValidationError(
                 "Check-in date cannot be in the past."
             )
         
-        # Check if check-out is after check-in
-        if check_out_date <= check_in_date:
+        # Check-out must be after check-in and within the maximum stay
+        nights = (check_out_date - check_in_date).days
+        if nights <= 0:
             raise serializers.ValidationError(
                 "Check-out date must be after check-in date."
             )
-        
-        # Check maximum stay duration (e.g., 30 days)
-        max_duration = timedelta(days=30)
-        if check_out_date - check_in_date > max_duration:
+        if nights > _MAX_STAY_DAYS:
             raise serializers.ValidationError(
-                f"Maximum stay duration is {max_duration.days} days."
+                f"Maximum stay duration is {_MAX_STAY_DAYS} days."
             )
         
         return attrs
@@ -48,14 +53,12 @@ class BookingValidationMixin:
         if not all([room, check_in_date, check_out_date]):
             return attrs
         
-        # Check for overlapping bookings
-        from .models import Booking
-        
-        overlapping_bookings = Booking.objects.filter(
+        # Check for overlapping bookings; a daterange && test on PostgreSQL
+        overlapping_bookings = Booking.objects.overlapping(
+            check_in_date, check_out_date
+        ).filter(
             room=room,
-            status__in=['confirmed', 'checked_in'],
-            check_in_date__lt=check_out_date,
-            check_out_date__gt=check_in_date
+            status__in=['confirmed', 'checked_in']
         )
         
         # Exclude current booking if updating
@@ -117,10 +120,8 @@ class ContactInfoValidator:
     @staticmethod
     def validate_phone_number(phone_number):
         """Validate phone number format."""
-        import re
-        
         # Remove all non-digit characters
-        digits_only = re.sub(r'\D', '', phone_number)
+        digits_only = _NONDIGIT_RE.sub('', phone_number)
         
         # Check length (should be between 10-15 digits)
         if len(digits_only) < 10 or len(digits_only) > 15:
@@ -135,11 +136,9 @@ class ContactInfoValidator:
         """Validate email domain against blacklist."""
         validate_email(email)
         
-        # Add domain blacklist if needed
-        blacklisted_domains = ['tempmail.com', '10minutemail.com']
-        domain = email.split('@')[1].lower()
+        domain = email.rpartition('@')[2].lower()
         
-        if domain in blacklisted_domains:
+        if domain in _BLACKLISTED_EMAIL_DOMAINS:
             raise serializers.ValidationError(
                 "Email from this domain is not allowed."
             )
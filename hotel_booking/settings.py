@@ -55,6 +55,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.security.AuditContextMiddleware',
 ]
 
 ROOT_URLCONF = 'hotel_booking.urls'
@@ -81,6 +82,40 @@ WSGI_APPLICATION = 'hotel_booking.wsgi.application'
 DATABASES = {
     'default': env.db(),
 }
+# Reuse connections across requests instead of reconnecting for each one;
+# health checks drop a connection the server closed before it is reused
+DATABASES['default']['CONN_MAX_AGE'] = env.int('CONN_MAX_AGE', default=600)
+DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+# Server-side cursors do not survive transaction pooling (e.g. pgBouncer
+# with pool_mode=transaction), which hands each transaction a new backend
+DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = env.bool('DB_TRANSACTION_POOLING', default=False)
+
+# Cache
+# django-redis when REDIS_URL is set; redis-py parses replies with the C
+# hiredis parser automatically once the hiredis package is installed
+REDIS_URL = env('REDIS_URL', default=None)
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': REDIS_URL,
+            'OPTIONS': {
+                'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+                'CONNECTION_POOL_KWARGS': {'max_connections': 100},
+            },
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
+
+# Elasticsearch
+# Bulk indexing (search_index --rebuild and queryset updates) sends its
+# batches from a thread pool via helpers.parallel_bulk
+ELASTICSEARCH_DSL_PARALLEL = env.bool('ELASTICSEARCH_DSL_PARALLEL', default=True)
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -101,6 +136,10 @@ AUTH_PASSWORD_VALIDATORS = [
 # Custom user model
 AUTH_USER_MODEL = 'users.User'
 
+# Sessions are read from the cache instead of a SELECT per request and are
+# still written through to the database
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -128,6 +167,10 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
 }
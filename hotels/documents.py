@@ -1,6 +1,9 @@
 from django_elasticsearch_dsl import Document, fields
 from django_elasticsearch_dsl.registries import registry
-from .models import Hotel
+from .models import Amenity, Hotel, Location, RoomType
+
+# Hotels loaded (and prefetched) per query while indexing
+INDEXING_CHUNK_SIZE = 2000
 
 
 @registry.register_document
@@ -49,18 +52,36 @@ class HotelDocument(Document):
         ]
         
         related_models = ['location', 'amenities', 'room_types']
+        # Bulk request size for queryset updates and search_index
+        queryset_pagination = INDEXING_CHUNK_SIZE
     
     def get_queryset(self):
         """Return the queryset that should be indexed."""
-        return super().get_queryset().select_related('location').prefetch_related(
-            'amenities', 'room_types'
-        ).filter(is_active=True)
+        return super().get_queryset().select_related('location').filter(is_active=True)
+    
+    def get_indexing_queryset(self, *args, **kwargs):
+        """
+        Yield the hotels to index in primary key ordered chunks.
+        
+        Amenities and room types are prefetched per chunk, one query each, so
+        at most INDEXING_CHUNK_SIZE hotels and their related rows are held in
+        memory.
+        """
+        queryset = self.get_queryset().prefetch_related('amenities', 'room_types').order_by('pk')
+        last_pk = None
+        while True:
+            chunk = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            chunk = list(chunk[:INDEXING_CHUNK_SIZE])
+            if not chunk:
+                return
+            yield from chunk
+            last_pk = chunk[-1].pk
     
     def get_instances_from_related(self, related_instance):
         """Update hotel document when related objects change."""
-        if isinstance(related_instance, Hotel.location.related.related_model):
+        if isinstance(related_instance, Location):
             return related_instance.hotel
-        elif isinstance(related_instance, Hotel.amenities.related.related_model):
+        elif isinstance(related_instance, Amenity):
             return related_instance.hotels.all()
-        elif isinstance(related_instance, Hotel.room_types.related.related_model):
+        elif isinstance(related_instance, RoomType):
             return related_instance.hotel
@@ -0,0 +1,28 @@
+import re
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import F
+from rest_framework import filters
+
+
+class HotelSearchFilter(filters.SearchFilter):
+    """
+    SearchFilter backed by Hotel.search_vector on PostgreSQL.
+    
+    Each search term must match the start of a word in the hotel's name,
+    description, city or country, and results are ordered by rank. Other
+    databases keep SearchFilter's icontains lookups over search_fields.
+    """
+    
+    def filter_queryset(self, request, queryset, view):
+        if connections[queryset.db].vendor != 'postgresql':
+            return super().filter_queryset(request, queryset, view)
+        
+        words = [word for term in self.get_search_terms(request) for word in re.findall(r'\w+', term)]
+        if not words:
+            return super().filter_queryset(request, queryset, view)
+        
+        query = SearchQuery(' & '.join(f'{word}:*' for word in words), config='simple', search_type='raw')
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F('search_vector'), query)
+        ).order_by('-search_rank', 'pk')
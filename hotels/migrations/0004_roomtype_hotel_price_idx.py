@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-14 03:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0003_location_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='roomtype',
+            index=models.Index(fields=['hotel', 'base_price'], name='roomtype_hotel_price_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-14 04:05
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_ratings(apps, schema_editor):
+    Hotel = apps.get_model('hotels', 'Hotel')
+    Review = apps.get_model('hotels', 'Review')
+    approved = Review.objects.filter(hotel=OuterRef('pk'), is_approved=True, is_deleted=False).order_by().values('hotel')
+    Hotel.objects.update(
+        average_rating=Coalesce(
+            Subquery(approved.annotate(avg=Avg('rating')).values('avg')),
+            Value(0.0),
+            output_field=models.FloatField()
+        ),
+        review_count=Coalesce(Subquery(approved.annotate(n=Count('id')).values('n')), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0004_roomtype_hotel_price_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hotel',
+            name='average_rating',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='hotel',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_ratings, migrations.RunPython.noop),
+    ]
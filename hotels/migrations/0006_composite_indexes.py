@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-14 04:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0005_hotel_average_rating'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='hotel',
+            index=models.Index(fields=['is_active', 'is_deleted', 'featured'], name='hotel_active_featured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hotel',
+            index=models.Index(fields=['is_active', 'is_deleted', 'star_rating'], name='hotel_active_stars_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['hotel', 'is_approved', 'rating'], name='review_hotel_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['hotel', 'is_approved', '-created_at'], name='review_hotel_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='roomtype',
+            index=models.Index(fields=['hotel', 'max_occupancy'], name='roomtype_hotel_occupancy_idx'),
+        ),
+    ]
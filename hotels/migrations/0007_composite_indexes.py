@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-14 04:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0006_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='hotelimage',
+            index=models.Index(condition=models.Q(('is_primary', True)), fields=['hotel', 'is_primary'], name='hotelimage_primary_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(fields=['hotel', 'is_available'], name='room_hotel_available_idx'),
+        ),
+    ]
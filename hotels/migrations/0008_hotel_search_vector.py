@@ -0,0 +1,75 @@
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# Hotel.search_vector covers the columns HotelViewSet searches: the hotel's
+# name and description, and its location's city and country. Triggers keep
+# it current when either table changes; the GIN index backs HotelSearchFilter.
+CREATE_SEARCH_VECTOR_SQL = """
+CREATE OR REPLACE FUNCTION hotels_hotel_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', coalesce(NEW.name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(
+            (SELECT concat_ws(' ', city, country) FROM hotels_location WHERE id = NEW.location_id), ''
+        )), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER hotels_hotel_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, description, location_id ON hotels_hotel
+    FOR EACH ROW EXECUTE PROCEDURE hotels_hotel_search_vector();
+
+CREATE OR REPLACE FUNCTION hotels_location_search_vector() RETURNS trigger AS $$
+BEGIN
+    UPDATE hotels_hotel SET name = name WHERE location_id = NEW.id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER hotels_location_search_vector_trigger
+    AFTER UPDATE OF city, country ON hotels_location
+    FOR EACH ROW EXECUTE PROCEDURE hotels_location_search_vector();
+
+UPDATE hotels_hotel SET name = name;
+
+CREATE INDEX IF NOT EXISTS hotel_search_vector_idx ON hotels_hotel USING gin (search_vector);
+"""
+
+DROP_SEARCH_VECTOR_SQL = """
+DROP INDEX IF EXISTS hotel_search_vector_idx;
+DROP TRIGGER IF EXISTS hotels_location_search_vector_trigger ON hotels_location;
+DROP FUNCTION IF EXISTS hotels_location_search_vector();
+DROP TRIGGER IF EXISTS hotels_hotel_search_vector_trigger ON hotels_hotel;
+DROP FUNCTION IF EXISTS hotels_hotel_search_vector();
+"""
+
+
+def create_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(CREATE_SEARCH_VECTOR_SQL)
+
+
+def drop_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(DROP_SEARCH_VECTOR_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0007_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hotel',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_vector, drop_search_vector),
+    ]
@@ -1,6 +1,9 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.db.models import Avg, Count, Q
 from core.models import BaseModel
+from core.optimizations import OptimizedHotelQuerySet, bump_cache_version
 
 
 class Amenity(BaseModel):
@@ -53,20 +56,47 @@ class Hotel(BaseModel):
     website = models.URLField(blank=True, null=True)
     is_active = models.BooleanField(default=True)
     featured = models.BooleanField(default=False)
+    # Denormalized from approved reviews by refresh_rating()
+    average_rating = models.FloatField(default=0, editable=False)
+    review_count = models.PositiveIntegerField(default=0, editable=False)
+    # Maintained by a database trigger on PostgreSQL (migration 0008); NULL elsewhere
+    search_vector = SearchVectorField(null=True, editable=False)
+    
+    objects = OptimizedHotelQuerySet.as_manager()
+    
+    _total_rooms = None
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['is_active', 'is_deleted', 'featured'], name='hotel_active_featured_idx'),
+            models.Index(fields=['is_active', 'is_deleted', 'star_rating'], name='hotel_active_stars_idx'),
+        ]
     
     def __str__(self):
         return self.name
     
-    @property
-    def average_rating(self):
-        reviews = self.reviews.filter(is_approved=True)
-        if reviews.exists():
-            return reviews.aggregate(models.Avg('rating'))['rating__avg']
-        return 0
+    @classmethod
+    def refresh_rating(cls, hotel_id):
+        """Recompute a hotel's stored rating from its approved reviews."""
+        stats = Review.objects.filter(hotel_id=hotel_id, is_approved=True, is_deleted=False).aggregate(
+            average_rating=Avg('rating'),
+            review_count=Count('id')
+        )
+        stats['average_rating'] = stats['average_rating'] or 0
+        cls.objects.filter(pk=hotel_id).update(**stats)
+        # The queryset update sends no post_save, so expire cached hotel queries here
+        bump_cache_version(cls.__name__)
     
     @property
     def total_rooms(self):
+        # Loaded with the hotel by OptimizedHotelQuerySet.with_total_rooms()
+        if self._total_rooms is not None:
+            return self._total_rooms
         return self.rooms.count()
+    
+    @total_rooms.setter
+    def total_rooms(self, value):
+        self._total_rooms = value
 
 
 class HotelImage(BaseModel):
@@ -78,6 +108,12 @@ class HotelImage(BaseModel):
     caption = models.CharField(max_length=255, blank=True, null=True)
     is_primary = models.BooleanField(default=False)
     
+    class Meta:
+        indexes = [
+            # Hotel listings only ever look up the primary image.
+            models.Index(fields=['hotel', 'is_primary'], name='hotelimage_primary_idx', condition=Q(is_primary=True)),
+        ]
+    
     def __str__(self):
         return f"Image for {self.hotel.name}"
 
@@ -94,6 +130,12 @@ class RoomType(BaseModel):
     size_sqm = models.PositiveSmallIntegerField(help_text="Size in square meters")
     amenities = models.ManyToManyField(Amenity, related_name='room_types')
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['hotel', 'base_price'], name='roomtype_hotel_price_idx'),
+            models.Index(fields=['hotel', 'max_occupancy'], name='roomtype_hotel_occupancy_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.name} at {self.hotel.name}"
 
@@ -111,6 +153,9 @@ class Room(BaseModel):
     
     class Meta:
         unique_together = ('hotel', 'room_number')
+        indexes = [
+            models.Index(fields=['hotel', 'is_available'], name='room_hotel_available_idx'),
+        ]
     
     def __str__(self):
         return f"Room {self.room_number} ({self.room_type.name}) at {self.hotel.name}"
@@ -144,5 +189,11 @@ class Review(BaseModel):
     stay_date = models.DateField()
     is_approved = models.BooleanField(default=False)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['hotel', 'is_approved', 'rating'], name='review_hotel_rating_idx'),
+            models.Index(fields=['hotel', 'is_approved', '-created_at'], name='review_hotel_recent_idx'),
+        ]
+    
     def __str__(self):
         return f"Review by {self.user.email} for {self.hotel.name}"
\ No newline at end of file
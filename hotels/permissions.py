@@ -44,5 +44,5 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
         if request.user.is_staff or request.user.is_superuser:
             return True
         
-        # Check if user is the owner of the object
-        return obj.user == request.user
\ No newline at end of file
+        # Check if user is the owner of the object (compare ids to skip loading obj.user)
+        return obj.user_id == request.user.pk
\ No newline at end of file
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from core.optimizations import DETAIL_REVIEW_COUNT, REVIEW_USER_NAME
 from .models import Hotel, HotelImage, Location, Amenity, RoomType, Room, RoomImage, Review
 
 
@@ -45,6 +46,10 @@ class ReviewSerializer(serializers.ModelSerializer):
         read_only_fields = ['user', 'is_approved']
     
     def get_user_name(self, obj):
+        # Annotated with core.optimizations.REVIEW_USER_NAME by the review views
+        user_name = getattr(obj, 'user_name', None)
+        if user_name is not None:
+            return user_name
         return f"{obj.user.first_name} {obj.user.last_name}"
     
     def create(self, validated_data):
@@ -82,7 +87,6 @@ class HotelListSerializer(serializers.ModelSerializer):
     
     location = LocationSerializer(read_only=True)
     primary_image = serializers.SerializerMethodField()
-    average_rating = serializers.FloatField(read_only=True)
     
     class Meta:
         model = Hotel
@@ -90,9 +94,14 @@ class HotelListSerializer(serializers.ModelSerializer):
                   'primary_image', 'average_rating', 'featured']
     
     def get_primary_image(self, obj):
-        primary_image = obj.images.filter(is_primary=True).first()
+        # Loaded by OptimizedHotelQuerySet.with_list_related()
+        primary_images = getattr(obj, 'primary_images', None)
+        if primary_images is not None:
+            primary_image = primary_images[0] if primary_images else None
+        else:
+            primary_image = obj.images.filter(is_primary=True).first()
         if primary_image:
-            return HotelImageSerializer(primary_image).data
+            return HotelImageSerializer(primary_image, context=self.context).data
         return None
 
 
@@ -104,7 +113,6 @@ class HotelDetailSerializer(serializers.ModelSerializer):
     images = HotelImageSerializer(many=True, read_only=True)
     room_types = RoomTypeSerializer(many=True, read_only=True)
     reviews = serializers.SerializerMethodField()
-    average_rating = serializers.FloatField(read_only=True)
     
     class Meta:
         model = Hotel
@@ -113,7 +121,12 @@ class HotelDetailSerializer(serializers.ModelSerializer):
                   'website', 'images', 'room_types', 'reviews', 'average_rating', 'featured']
     
     def get_reviews(self, obj):
-        reviews = obj.reviews.filter(is_approved=True)[:5]  # Get only 5 approved reviews
+        # Loaded by OptimizedHotelQuerySet.with_detail_related()
+        reviews = getattr(obj, 'recent_reviews', None)
+        if reviews is None:
+            reviews = obj.reviews.filter(is_approved=True, is_deleted=False).annotate(
+                user_name=REVIEW_USER_NAME
+            ).order_by('-created_at')[:DETAIL_REVIEW_COUNT]
         return ReviewSerializer(reviews, many=True).data
     
     def create(self, validated_data):
@@ -0,0 +1,13 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import Hotel, Review
+
+
+@receiver([post_save, post_delete], sender=Review)
+def refresh_hotel_rating(sender, instance, **kwargs):
+    """
+    Refresh the stored average rating of the review's hotel.
+    """
+    hotel_id = instance.hotel_id
+    transaction.on_commit(lambda: Hotel.refresh_rating(hotel_id))
@@ -0,0 +1,260 @@
+import warnings
+from decimal import Decimal
+from importlib import import_module
+from django.apps import apps
+from django.core.cache import cache
+from django.core.paginator import UnorderedObjectListWarning
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, APITestCase
+from core.optimizations import get_cache_version
+from users.models import User
+from .documents import HotelDocument
+from .models import Amenity, Hotel, HotelImage, Location, Review, Room, RoomImage, RoomType
+from .views import RoomTypeViewSet, RoomViewSet
+
+
+def create_hotel(name='Test Hotel', **kwargs):
+    """Create a hotel with its own location."""
+    location = Location.objects.create(
+        address=f'1 {name} Street',
+        city='Lagos',
+        state='Lagos',
+        country='Nigeria',
+        zip_code='100001'
+    )
+    fields = {
+        'name': name,
+        'description': 'A test hotel',
+        'location': location,
+        'star_rating': 4,
+        'contact_email': 'hotel@example.com',
+        'contact_phone': '+2340000000',
+    }
+    fields.update(kwargs)
+    return Hotel.objects.create(**fields)
+
+
+class HotelDocumentTests(TestCase):
+    """Tests for the hotel Elasticsearch document."""
+    
+    def setUp(self):
+        self.hotel = create_hotel()
+        self.other_hotel = create_hotel(name='Other Hotel')
+        self.amenity = Amenity.objects.create(name='Pool')
+        self.hotel.amenities.add(self.amenity)
+        self.other_hotel.amenities.add(self.amenity)
+        self.room_type = RoomType.objects.create(
+            hotel=self.hotel,
+            name='Standard',
+            description='A standard room',
+            max_occupancy=2,
+            base_price=Decimal('100.00'),
+            size_sqm=20
+        )
+        self.document = HotelDocument()
+    
+    def test_related_changes_return_hotels(self):
+        """Test that related objects map to the hotels the registry must re-index."""
+        self.assertEqual(self.document.get_instances_from_related(self.hotel.location), self.hotel)
+        self.assertEqual(self.document.get_instances_from_related(self.room_type), self.hotel)
+        self.assertQuerysetEqual(
+            self.document.get_instances_from_related(self.amenity),
+            [self.hotel, self.other_hotel],
+            ordered=False
+        )
+
+
+class HotelRatingTests(TestCase):
+    """Tests for the stored hotel rating."""
+    
+    def setUp(self):
+        cache.clear()
+        self.hotel = create_hotel()
+        self.other_hotel = create_hotel(name='Other Hotel')
+        self.user = User.objects.create_user(
+            email='guest@example.com', password='testpassword', first_name='Test', last_name='Guest'
+        )
+        # Outside captureOnCommitCallbacks the on-commit refresh never runs,
+        # so the stored ratings stay at their defaults
+        self.create_review(rating=5)
+        self.create_review(rating=2)
+        self.create_review(rating=1, is_approved=False)
+        self.create_review(rating=1).delete()
+    
+    def create_review(self, rating, is_approved=True):
+        return Review.objects.create(
+            hotel=self.hotel, user=self.user, rating=rating, title='Stay', comment='A stay',
+            stay_date=self.hotel.created_at.date(), is_approved=is_approved
+        )
+    
+    def assertRating(self, hotel, average_rating, review_count):
+        hotel.refresh_from_db()
+        self.assertEqual((hotel.average_rating, hotel.review_count), (average_rating, review_count))
+    
+    def test_refresh_rating(self):
+        """Test that only approved, undeleted reviews count and cached hotel queries expire."""
+        version = get_cache_version('Hotel')
+        
+        Hotel.refresh_rating(self.hotel.id)
+        
+        self.assertRating(self.hotel, 3.5, 2)
+        self.assertEqual(get_cache_version('Hotel'), version + 1)
+    
+    def test_backfill(self):
+        """Test that the 0005 data migration fills in every hotel's rating."""
+        migration = import_module('hotels.migrations.0005_hotel_average_rating')
+        Hotel.objects.update(average_rating=4, review_count=9)
+        
+        migration.populate_ratings(apps, None)
+        
+        self.assertRating(self.hotel, 3.5, 2)
+        self.assertRating(self.other_hotel, 0, 0)
+
+
+class HotelListAPITests(APITestCase):
+    """Tests for the hotel list endpoint."""
+    
+    def setUp(self):
+        cache.clear()
+        self.hotel = create_hotel(featured=True)
+        self.hotel.location.latitude = Decimal('6.524379')
+        self.hotel.location.save()
+        HotelImage.objects.create(hotel=self.hotel, image='hotel_images/front.jpg', is_primary=True)
+        HotelImage.objects.create(hotel=self.hotel, image='hotel_images/pool.jpg', is_primary=False)
+    
+    def test_list_payload(self):
+        """Test the rendered shape of a hotel in the list."""
+        response = self.client.get('/api/hotels/', HTTP_ACCEPT='application/json')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+        hotel = response.data['results'][0]
+        self.assertEqual(hotel['name'], 'Test Hotel')
+        self.assertEqual(hotel['location']['city'], 'Lagos')
+        self.assertEqual(hotel['location']['latitude'], '6.524379')
+        self.assertIsNone(hotel['location']['longitude'])
+        self.assertEqual(hotel['average_rating'], 0.0)
+        self.assertTrue(hotel['featured'])
+        self.assertEqual(hotel['primary_image']['image'], 'http://testserver/media/hotel_images/front.jpg')
+        self.assertTrue(hotel['primary_image']['is_primary'])
+    
+    def test_list_queries_do_not_grow_with_hotels(self):
+        """Test that locations and primary images are loaded once per page."""
+        with self.assertNumQueries(3):  # count, hotels with locations, primary images
+            self.client.get('/api/hotels/', HTTP_ACCEPT='application/json')
+        
+        for i in range(3):
+            hotel = create_hotel(name=f'Hotel {i}')
+            HotelImage.objects.create(hotel=hotel, image=f'hotel_images/{i}.jpg', is_primary=True)
+        cache.clear()
+        
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/hotels/', HTTP_ACCEPT='application/json')
+        self.assertEqual(response.data['count'], 4)
+    
+    def test_list_is_cached_until_hotels_change(self):
+        """Test that a repeated search is served from the cache and expires on a hotel write."""
+        self.client.get('/api/hotels/', HTTP_ACCEPT='application/json')
+        with self.assertNumQueries(0):
+            self.client.get('/api/hotels/', HTTP_ACCEPT='application/json')
+        
+        create_hotel(name='New Hotel')
+        response = self.client.get('/api/hotels/', HTTP_ACCEPT='application/json')
+        
+        self.assertEqual(response.data['count'], 2)
+    
+    def test_list_order_is_fixed(self):
+        """Test that featured hotels come first, then hotels by name."""
+        create_hotel(name='Beta Hotel')
+        create_hotel(name='Alpha Hotel')
+        
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', UnorderedObjectListWarning)
+            response = self.client.get('/api/hotels/', HTTP_ACCEPT='application/json')
+        
+        names = [hotel['name'] for hotel in response.data['results']]
+        self.assertEqual(names, ['Test Hotel', 'Alpha Hotel', 'Beta Hotel'])
+
+
+class RoomListAPITests(APITestCase):
+    """Tests for the room type and room list endpoints."""
+    
+    def setUp(self):
+        cache.clear()
+        self.hotel = create_hotel()
+        self.amenity = Amenity.objects.create(name='Wi-Fi', icon='wifi')
+        self.room_type = self.create_room_type('Standard')
+        for number in ('101', '102'):
+            Room.objects.create(hotel=self.hotel, room_type=self.room_type, room_number=number, floor=1)
+        self.factory = APIRequestFactory()
+    
+    def create_room_type(self, name):
+        room_type = RoomType.objects.create(
+            hotel=self.hotel,
+            name=name,
+            description='A room',
+            max_occupancy=2,
+            base_price=Decimal('120.50'),
+            size_sqm=20
+        )
+        room_type.amenities.add(self.amenity)
+        RoomImage.objects.create(room_type=room_type, image=f'room_images/{name}.jpg', is_primary=True)
+        return room_type
+    
+    def list(self, viewset):
+        request = self.factory.get('/', HTTP_ACCEPT='application/json')
+        return viewset.as_view({'get': 'list'})(request)
+    
+    def test_room_type_list_payload(self):
+        """Test the rendered shape of a room type with its amenities and images."""
+        response = self.list(RoomTypeViewSet)
+        
+        room_type = response.data['results'][0]
+        self.assertEqual(room_type['base_price'], '120.50')
+        self.assertEqual(room_type['hotel'], self.hotel.id)
+        self.assertEqual(room_type['amenities'], [
+            {'id': self.amenity.id, 'name': 'Wi-Fi', 'description': None, 'icon': 'wifi'}
+        ])
+        self.assertEqual(room_type['images'][0]['image'], 'http://testserver/media/room_images/Standard.jpg')
+    
+    def test_room_urls_match_across_endpoints(self):
+        """Test that RoomViewSet.list and HotelViewSet.rooms render rooms identically."""
+        rooms = self.list(RoomViewSet).data['results']
+        hotel_rooms = self.client.get(
+            f'/api/hotels/{self.hotel.id}/rooms/', HTTP_ACCEPT='application/json'
+        ).data['results']
+        
+        self.assertEqual(hotel_rooms, rooms)
+        self.assertEqual(rooms[0]['room_type']['images'][0]['image'], 'http://testserver/media/room_images/Standard.jpg')
+    
+    def test_list_queries_do_not_grow_with_room_types(self):
+        """Test that nested amenities and images are loaded once per page."""
+        # count, page, amenities, images
+        with self.assertNumQueries(4):
+            self.list(RoomTypeViewSet)
+        with self.assertNumQueries(4):
+            self.list(RoomViewSet)
+        
+        other = self.create_room_type('Deluxe')
+        Room.objects.create(hotel=self.hotel, room_type=other, room_number='201', floor=2)
+        cache.clear()
+        
+        with self.assertNumQueries(4):
+            self.list(RoomTypeViewSet)
+        with self.assertNumQueries(4):
+            self.list(RoomViewSet)
+    
+    def test_list_order_is_fixed(self):
+        """Test that room types and rooms are paginated in a fixed order."""
+        other = self.create_room_type('Budget')
+        other.base_price = Decimal('80.00')
+        other.save()
+        Room.objects.create(hotel=self.hotel, room_type=other, room_number='001', floor=0)
+        
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', UnorderedObjectListWarning)
+            room_types = self.list(RoomTypeViewSet).data['results']
+            rooms = self.list(RoomViewSet).data['results']
+        
+        self.assertEqual([room_type['name'] for room_type in room_types], ['Budget', 'Standard'])
+        self.assertEqual([room['room_number'] for room in rooms], ['001', '101', '102'])
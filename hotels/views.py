@@ -1,8 +1,13 @@
+import hashlib
+from urllib.parse import urlencode
 from rest_framework import viewsets, permissions, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Avg
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef, Q
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from django.views.generic import ListView
 from django.shortcuts import render
 from .models import Hotel, Amenity, RoomType, Room, Review
@@ -10,9 +15,34 @@ from .serializers import (
     HotelListSerializer, HotelDetailSerializer, AmenitySerializer,
     RoomTypeSerializer, RoomSerializer, ReviewSerializer
 )
+from .filters import HotelSearchFilter
 from .permissions import IsHotelManagerOrReadOnly, IsOwnerOrReadOnly
+from core.optimizations import REVIEW_USER_NAME, get_cache_version
+from core.pagination import CachedCountPagination
 
+HOTEL_LIST_CACHE_TIMEOUT = 300
+# Models whose writes change a hotel list page or its filter results.
+# Amenity assignments go through the M2M table, which sends no post_save,
+# so those show up once the cached page expires.
+HOTEL_LIST_MODELS = ('Hotel', 'Location', 'HotelImage', 'RoomType')
 
+
+def versioned_etag(*model_names):
+    """
+    Build a condition() etag_func for a list rendered from model_names.
+    
+    The ETag changes whenever one of the models' cache versions is bumped,
+    so an unchanged list is answered with 304 before it is queried.
+    """
+    def etag_func(request, *args, **kwargs):
+        versions = ':'.join(str(get_cache_version(model)) for model in model_names)
+        # The negotiated renderer (JSON or browsable API) depends on Accept
+        key = f"{versions}|{request.get_full_path()}|{request.META.get('HTTP_ACCEPT', '')}"
+        return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+    return etag_func
+
+
+@method_decorator(condition(etag_func=versioned_etag('Amenity')), name='list')
 class AmenityViewSet(viewsets.ReadOnlyModelViewSet):
     """
     API endpoint for amenities.
@@ -26,28 +56,74 @@ class HotelViewSet(viewsets.ModelViewSet):
     """
     API endpoint for hotels.
     """
-    queryset = Hotel.objects.filter(is_active=True, is_deleted=False)
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # Cached pages need a fixed order; set on the queryset rather than as the
+    # OrderingFilter default so that search results keep their rank order
+    queryset = Hotel.objects.filter(is_active=True, is_deleted=False).order_by('-featured', 'name', 'id')
+    pagination_class = CachedCountPagination
+    filter_backends = [DjangoFilterBackend, HotelSearchFilter, filters.OrderingFilter]
     filterset_fields = ['star_rating', 'featured', 'location__city', 'location__country']
     search_fields = ['name', 'description', 'location__city', 'location__country']
     ordering_fields = ['name', 'star_rating', 'created_at']
     permission_classes = [IsHotelManagerOrReadOnly]
     
+    # Columns read by RoomSerializer and ReviewSerializer in the nested actions
+    ROOM_FIELDS = (
+        'id', 'room_number', 'floor', 'is_available', 'notes', 'hotel_id',
+        'room_type__id', 'room_type__name', 'room_type__description', 'room_type__hotel_id',
+        'room_type__max_occupancy', 'room_type__base_price', 'room_type__size_sqm',
+    )
+    REVIEW_FIELDS = (
+        'id', 'hotel_id', 'user_id', 'rating', 'title', 'comment', 'stay_date', 'created_at',
+    )
+    
+    def list(self, request, *args, **kwargs):
+        """
+        List hotels, serving repeated searches from the cache.
+        
+        The key embeds the cache version of every listed model, so any write
+        to them orphans the cached pages.
+        """
+        versions = ':'.join(str(get_cache_version(model)) for model in HOTEL_LIST_MODELS)
+        # Pagination links and image URLs are absolute, so the scheme and
+        # host are part of the key
+        params = urlencode(sorted(request.query_params.lists()), doseq=True)
+        digest = hashlib.blake2b(f"{request.build_absolute_uri('/')}|{params}".encode(), digest_size=16).hexdigest()
+        cache_key = f"hotel:list:{versions}:{digest}"
+        
+        data = cache.get(cache_key)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            cache.set(cache_key, data, HOTEL_LIST_CACHE_TIMEOUT)
+        return Response(data)
+    
     def get_queryset(self):
-        queryset = super().get_queryset().annotate(average_rating=Avg('reviews__rating'))
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            queryset = queryset.with_list_related()
+        elif self.action not in ('rooms', 'reviews'):
+            # The nested actions only need the hotel row itself
+            queryset = queryset.with_detail_related()
         
-        # Filter by amenities
+        # Filter by amenities (hotels offering any of them)
         amenities = self.request.query_params.getlist('amenities')
         if amenities:
-            queryset = queryset.filter(amenities__id__in=amenities).distinct()
+            queryset = queryset.filter(Exists(
+                Hotel.amenities.through.objects.filter(hotel_id=OuterRef('pk'), amenity_id__in=amenities)
+            ))
         
-        # Filter by price range
+        # Filter by price range: semi-join on a room type priced within it,
+        # backed by the (hotel, base_price) index
         min_price = self.request.query_params.get('min_price')
         max_price = self.request.query_params.get('max_price')
+        price_q = Q()
         if min_price:
-            queryset = queryset.filter(room_types__base_price__gte=min_price).distinct()
+            price_q &= Q(base_price__gte=min_price)
         if max_price:
-            queryset = queryset.filter(room_types__base_price__lte=max_price).distinct()
+            price_q &= Q(base_price__lte=max_price)
+        if price_q:
+            queryset = queryset.filter(Exists(
+                RoomType.objects.filter(price_q, hotel=OuterRef('pk'), is_deleted=False)
+            ))
         
         return queryset
     
@@ -62,8 +138,15 @@ class HotelViewSet(viewsets.ModelViewSet):
         Get all rooms for a hotel.
         """
         hotel = self.get_object()
-        rooms = Room.objects.filter(hotel=hotel)
-        serializer = RoomSerializer(rooms, many=True)
+        rooms = Room.objects.filter(hotel=hotel).select_related('room_type').prefetch_related(
+            'room_type__amenities', 'room_type__images'
+        ).only(*self.ROOM_FIELDS).order_by('room_number')
+        # The request in the context renders image URLs absolute, as in RoomViewSet
+        context = self.get_serializer_context()
+        page = self.paginate_queryset(rooms)
+        if page is not None:
+            return self.get_paginated_response(RoomSerializer(page, many=True, context=context).data)
+        serializer = RoomSerializer(rooms, many=True, context=context)
         return Response(serializer.data)
     
     @action(detail=True, methods=['get', 'post'])
@@ -74,7 +157,12 @@ class HotelViewSet(viewsets.ModelViewSet):
         hotel = self.get_object()
         
         if request.method == 'GET':
-            reviews = hotel.reviews.filter(is_approved=True)
+            reviews = hotel.reviews.filter(is_approved=True).only(*self.REVIEW_FIELDS).annotate(
+                user_name=REVIEW_USER_NAME
+            ).order_by('-created_at')
+            page = self.paginate_queryset(reviews)
+            if page is not None:
+                return self.get_paginated_response(ReviewSerializer(page, many=True).data)
             serializer = ReviewSerializer(reviews, many=True)
             return Response(serializer.data)
         
@@ -99,9 +187,11 @@ class RoomTypeViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['hotel', 'max_occupancy']
     ordering_fields = ['base_price', 'max_occupancy']
+    ordering = ['hotel', 'base_price', 'id']
     
     def get_queryset(self):
-        queryset = super().get_queryset()
+        # Nested amenities and images are loaded once per page
+        queryset = super().get_queryset().prefetch_related('amenities', 'images')
         
         # Filter by price range
         min_price = self.request.query_params.get('min_price')
@@ -119,15 +209,22 @@ class RoomTypeViewSet(viewsets.ModelViewSet):
         return queryset
 
 
+@method_decorator(condition(etag_func=versioned_etag('Room', 'RoomType', 'Amenity', 'RoomImage')), name='list')
 class RoomViewSet(viewsets.ModelViewSet):
     """
     API endpoint for rooms.
     """
-    queryset = Room.objects.filter(is_deleted=False)
+    queryset = Room.objects.filter(is_deleted=False).order_by('hotel', 'room_number')
     serializer_class = RoomSerializer
     permission_classes = [IsHotelManagerOrReadOnly]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['hotel', 'room_type', 'floor', 'is_available']
+    
+    def get_queryset(self):
+        # Room types and their nested amenities and images are loaded once per page
+        return super().get_queryset().select_related('room_type').prefetch_related(
+            'room_type__amenities', 'room_type__images'
+        )
 
 
 class ReviewViewSet(viewsets.ModelViewSet):
@@ -142,9 +239,10 @@ class ReviewViewSet(viewsets.ModelViewSet):
     ordering_fields = ['created_at', 'rating']
     
     def get_queryset(self):
+        queryset = Review.objects.annotate(user_name=REVIEW_USER_NAME)
         if self.request.user.is_staff:
-            return Review.objects.all()
-        return Review.objects.filter(is_approved=True)
+            return queryset
+        return queryset.filter(is_approved=True)
 
 
 # Web Views for templates
@@ -161,6 +259,4 @@ class HotelListView(ListView):
         return Hotel.objects.filter(
             is_active=True, 
             is_deleted=False
-        ).annotate(
-            average_rating=Avg('reviews__rating')
         ).order_by('-featured', '-created_at')
\ No newline at end of file
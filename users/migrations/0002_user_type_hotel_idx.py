@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-14 04:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['user_type', 'hotel'], name='user_type_hotel_idx'),
+        ),
+    ]
@@ -63,6 +63,11 @@ class User(AbstractUser, TimeStampedModel):
 
     objects = UserManager()
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['user_type', 'hotel'], name='user_type_hotel_idx'),
+        ]
+
     def __str__(self):
         return self.email
     
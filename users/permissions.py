@@ -7,12 +7,12 @@ class IsCustomer(permissions.BasePermission):
     """
     
     def has_permission(self, request, view):
-        # Allow if user is authenticated and is not a hotel manager
-        return request.user.is_authenticated and not hasattr(request.user, 'hotel_manager')
+        # Allow if user is authenticated and is a customer
+        return request.user.is_authenticated and request.user.is_customer()
     
     def has_object_permission(self, request, view, obj):
-        # Allow if the object belongs to the user
-        return obj.user == request.user
+        # Allow if the object belongs to the user (compare ids to skip loading obj.user)
+        return obj.user_id == request.user.pk
 
 
 class IsHotelManager(permissions.BasePermission):
@@ -22,10 +22,9 @@ class IsHotelManager(permissions.BasePermission):
     
     def has_permission(self, request, view):
         # Allow if user is authenticated and is a hotel manager
-        return request.user.is_authenticated and hasattr(request.user, 'hotel_manager')
+        return request.user.is_authenticated and request.user.is_hotel_manager()
     
     def has_object_permission(self, request, view, obj):
         # Allow if the object's hotel is managed by the user
-        if hasattr(obj, 'hotel'):
-            return obj.hotel in request.user.hotel_manager.hotels.all()
-        return False
\ No newline at end of file
+        hotel_id = getattr(obj, 'hotel_id', None)
+        return hotel_id is not None and hotel_id == request.user.hotel_id
\ No newline at end of file
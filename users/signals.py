@@ -11,6 +11,9 @@ def create_user_profile(sender, instance, created, **kwargs):
 
 
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
+def save_user_profile(sender, instance, update_fields=None, **kwargs):
     """Save the UserProfile when the User is saved."""
+    # Partial saves (password changes, last_login) leave the profile alone
+    if update_fields is not None:
+        return
     instance.profile.save()
\ No newline at end of file
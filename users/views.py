@@ -5,12 +5,19 @@ from django.contrib.auth import get_user_model, update_session_auth_hash, logout
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, redirect
 from django.contrib import messages
+from django.core.cache import cache
+from django.db import transaction
+from bookings.models import Booking
 from .models import UserProfile
 from .serializers import UserSerializer, UserProfileSerializer, UserRegistrationSerializer, PasswordChangeSerializer
 from .forms import CustomUserCreationForm, CustomUserChangeForm, UserProfileForm, CustomPasswordChangeForm
 
 User = get_user_model()
 
+PROFILE_BOOKINGS_LIMIT = 20
+ACTIVE_BOOKINGS_CACHE_KEY = 'hotel:active_bookings:{hotel_id}'
+ACTIVE_BOOKINGS_CACHE_TIMEOUT = 60
+
 
 class UserViewSet(viewsets.ModelViewSet):
     """
@@ -19,6 +26,15 @@ class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     
+    # Columns UserSerializer reads; the rest of the user row (password hash,
+    # permission flags, timestamps) is skipped on reads.
+    READ_FIELDS = (
+        'id', 'email', 'first_name', 'last_name', 'phone_number', 'address',
+        'profile_picture', 'user_type',
+        'profile__id', 'profile__user_id', 'profile__date_of_birth', 'profile__bio',
+        'profile__preferences', 'profile__loyalty_points', 'profile__loyalty_level',
+    )
+    
     def get_permissions(self):
         """
         Allow users to create their own account, but require authentication for other actions.
@@ -35,9 +51,12 @@ class UserViewSet(viewsets.ModelViewSet):
         Staff users can see all profiles.
         """
         user = self.request.user
+        queryset = User.objects.all()
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.select_related('profile').only(*self.READ_FIELDS)
         if user.is_staff or user.is_superuser:
-            return User.objects.all()
-        return User.objects.filter(id=user.id)
+            return queryset
+        return queryset.filter(id=user.id)
     
     @action(detail=False, methods=['get'])
     def me(self, request):
@@ -65,13 +84,17 @@ class UserViewSet(viewsets.ModelViewSet):
         """
         Change the user's password.
         """
-        user = request.user
         serializer = PasswordChangeSerializer(data=request.data)
         if serializer.is_valid():
-            if not user.check_password(serializer.validated_data['old_password']):
-                return Response({"old_password": ["Wrong password."]}, status=status.HTTP_400_BAD_REQUEST)
-            user.set_password(serializer.validated_data['new_password'])
-            user.save()
+            # Lock the row so concurrent changes verify against the latest hash
+            with transaction.atomic():
+                user = User.objects.select_for_update().only('id', 'password', 'updated_at').get(pk=request.user.pk)
+                if not user.check_password(serializer.validated_data['old_password']):
+                    return Response({"old_password": ["Wrong password."]}, status=status.HTTP_400_BAD_REQUEST)
+                user.set_password(serializer.validated_data['new_password'])
+                user.save(update_fields=['password', 'updated_at'])
+            # Keep the current session valid with the new password hash
+            update_session_auth_hash(request, user)
             return Response({"status": "password changed"}, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -113,14 +136,21 @@ def profile(request):
     # Get user's bookings if they are a customer
     bookings = None
     if request.user.is_customer():
-        bookings = request.user.bookings.all().order_by('-created_at')
+        bookings = request.user.bookings.select_related('hotel').only(
+            'id', 'user', 'booking_number', 'check_in_date', 'check_out_date', 'status', 'hotel__name',
+        ).order_by('-created_at')[:PROFILE_BOOKINGS_LIMIT]
     
     # Get active bookings count if they are a hotel manager
     active_bookings_count = 0
-    if request.user.is_hotel_manager() and request.user.hotel:
-        active_bookings_count = request.user.hotel.bookings.filter(
-            status__in=['confirmed', 'checked_in']
-        ).count()
+    hotel_id = request.user.hotel_id
+    if request.user.is_hotel_manager() and hotel_id:
+        active_bookings_count = cache.get_or_set(
+            ACTIVE_BOOKINGS_CACHE_KEY.format(hotel_id=hotel_id),
+            lambda: Booking.objects.filter(
+                hotel_id=hotel_id, status__in=[Booking.STATUS_CONFIRMED, Booking.STATUS_CHECKED_IN]
+            ).count(),
+            timeout=ACTIVE_BOOKINGS_CACHE_TIMEOUT,
+        )
     
     context = {
         'user_form': user_form,